@@ -0,0 +1,335 @@
+"""
+Benchmarks degrees loading and searching over synthetic datasets.
+
+    python bench.py generate DIRECTORY --edges 1000000
+    python bench.py run DIRECTORY [--queries 200] [--modes bfs alt ...]
+    python bench.py lookup DIRECTORY [--queries 1000] [--typos 2]
+
+generate writes people.csv, movies.csv and stars.csv with a power-law cast
+distribution: a few movies have large casts and a few people star in a
+great many movies, as in the IMDb data. run loads the data once per search
+mode, each in a fresh process so peak memory is measured separately, runs
+the same fixed query set through it and prints one JSON object per mode.
+lookup measures name resolution: exact names, and names with one or more
+typos, which need an edit-distance search.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from bisect import bisect
+from itertools import accumulate
+
+# Each mode is (compact, bidirectional, landmarks)
+MODES = {
+    "bfs": (False, False, 0),
+    "bidirectional": (False, True, 0),
+    "compact-bfs": (True, False, 0),
+    "compact-bidirectional": (True, True, 0),
+    "alt": (True, False, 16)
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser(
+        "generate", help="write a synthetic dataset"
+    )
+    generate_parser.add_argument("directory")
+    generate_parser.add_argument("--edges", type=int, default=100000,
+                                 help="number of star rows")
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="benchmark search modes")
+    run_parser.add_argument("directory")
+    run_parser.add_argument("--queries", type=int, default=200,
+                            help="number of source/target pairs")
+    run_parser.add_argument("--modes", nargs="+", choices=list(MODES),
+                            default=list(MODES))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output",
+                            help="also write results to this JSON file")
+
+    lookup_parser = commands.add_parser(
+        "lookup", help="benchmark name resolution"
+    )
+    lookup_parser.add_argument("directory")
+    lookup_parser.add_argument("--queries", type=int, default=1000,
+                               help="number of names looked up per test")
+    lookup_parser.add_argument("--typos", type=int, default=2,
+                               help="most edits made to a looked up name")
+    lookup_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args.directory, args.edges, args.seed)
+    elif args.command == "lookup":
+        for result in lookup_names(args.directory, args.queries,
+                                   args.typos, args.seed):
+            print(json.dumps(result))
+    else:
+        results = run(args.directory, args.modes, args.queries, args.seed)
+        for result in results:
+            print(json.dumps(result))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+
+
+# Largest cast of a synthetic movie
+MAX_CAST = 60
+
+# Letters of synthetic names, which are built from syllables so that, as
+# with real names, their letter sequences vary as much as name lookups
+# would see
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiouy"
+
+
+def person_name(rng):
+    """
+    Returns a random first and last name.
+    """
+    def word(syllables):
+        return "".join(
+            rng.choice(CONSONANTS) + rng.choice(VOWELS)
+            + (rng.choice(CONSONANTS) if rng.random() < 0.4 else "")
+            for _ in range(syllables)
+        ).capitalize()
+    return f"{word(rng.randint(1, 3))} {word(rng.randint(2, 3))}"
+
+
+def generate(directory, edges, seed=0, popularity_exponent=0.8,
+             cast_exponent=2.0):
+    """
+    Writes a synthetic dataset with about edges star rows to directory.
+
+    Cast sizes follow a power law between 1 and MAX_CAST, and each cast is
+    drawn from people whose popularity follows a Zipf-like law, so a few
+    people star in a great many movies.
+    """
+    rng = random.Random(seed)
+    cast_sizes = range(1, MAX_CAST + 1)
+    cast_weights = [size ** -cast_exponent for size in cast_sizes]
+    mean_cast = sum(size * weight for size, weight
+                    in zip(cast_sizes, cast_weights)) / sum(cast_weights)
+    num_movies = max(round(edges / mean_cast), 1)
+    num_people = max(edges // 4, MAX_CAST)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(num_people):
+            writer.writerow([person + 1, person_name(rng),
+                             rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(num_movies):
+            writer.writerow([movie + 1, f"Movie {movie + 1}",
+                             rng.randint(1920, 2020)])
+
+    # Shuffle ranks so popular people are spread across the id space
+    popularity = list(accumulate(
+        (rank + 1) ** -popularity_exponent for rank in range(num_people)
+    ))
+    by_rank = list(range(num_people))
+    rng.shuffle(by_rank)
+    casts = rng.choices(cast_sizes, cast_weights, k=num_movies)
+
+    with open(os.path.join(directory, "stars.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie, cast in enumerate(casts):
+            stars = set()
+            while len(stars) < cast:
+                rank = bisect(popularity, rng.random() * popularity[-1])
+                stars.add(by_rank[min(rank, num_people - 1)])
+            for person in stars:
+                writer.writerow([person + 1, movie + 1])
+
+
+def run(directory, modes, queries, seed=0):
+    """
+    Benchmarks each mode on directory in a fresh process and returns a
+    list of result dictionaries.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for mode in modes:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_mode,
+                                      (directory, mode, queries, seed)))
+    return results
+
+
+def run_mode(directory, mode, queries, seed):
+    """
+    Loads directory, runs the query set in one mode and returns its result.
+    """
+    import degrees
+    import graph
+    import landmarks
+
+    compact, bidirectional, landmark_count = MODES[mode]
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=compact)
+    load_seconds = time.perf_counter() - start
+    if landmark_count:
+        start = time.perf_counter()
+        degrees.landmark_table = landmarks.Landmarks.choose(
+            degrees.graph, landmark_count
+        )
+        preprocess_seconds = time.perf_counter() - start
+    else:
+        preprocess_seconds = 0
+
+    # The same pairs in every mode, since they depend only on the seed
+    person_ids = sorted(degrees.people)
+    rng = random.Random(seed)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(queries)]
+
+    # Count people expanded by wrapping the function each mode calls once
+    # per expanded person
+    expanded = 0
+    if landmark_count:
+        search = landmarks.Landmarks.search
+
+        def counted(self, *args):
+            nonlocal expanded
+            path, count = search(self, *args)
+            expanded += count
+            return path, count
+
+        landmarks.Landmarks.search = counted
+        landmarks.Landmarks.shortest_path = lambda self, *args: \
+            self.search(*args)[0]
+    elif compact:
+        expand = graph.Graph.expand
+
+        def counted(*args):
+            nonlocal expanded
+            expanded += 1
+            return expand(*args)
+
+        graph.Graph.expand = counted
+    else:
+        neighbors = degrees.neighbors_for_person
+
+        def counted(person_id):
+            nonlocal expanded
+            expanded += 1
+            return neighbors(person_id)
+
+        degrees.neighbors_for_person = counted
+
+    latencies = []
+    connected = 0
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target, bidirectional)
+        latencies.append(time.perf_counter() - start)
+        connected += path is not None
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "directory": directory,
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "load_seconds": load_seconds,
+        "preprocess_seconds": preprocess_seconds,
+        "queries": queries,
+        "connected": connected,
+        "expanded_per_query": expanded / queries if queries else 0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p90": percentile(latencies, 90),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": latencies[-1] if latencies else None,
+        "peak_memory": degrees.peak_memory(),
+        "python": sys.version.split()[0]
+    }
+
+
+def lookup_names(directory, queries, typos, seed=0):
+    """
+    Benchmarks resolving names from directory's people.csv and returns a
+    list of result dictionaries: one for exact names and one for each
+    number of typos up to typos.
+    """
+    import lookup
+
+    with open(os.path.join(directory, "people.csv"), encoding="utf-8") as f:
+        people = [(row["id"], row["name"], row["birth"], 0)
+                  for row in csv.DictReader(f)]
+    start = time.perf_counter()
+    index = lookup.NameIndex(people)
+
+    # The edit-distance filter is built on the first fuzzy search
+    index.resolve("", max_distance=typos)
+    index.resolve("x" * 8, max_distance=typos)
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    names = [rng.choice(people)[1] for _ in range(queries)]
+    letters = CONSONANTS + VOWELS
+    results = []
+    for edits in range(typos + 1):
+        misspelt = []
+        for name in names:
+            for _ in range(edits):
+                i = rng.randrange(len(name))
+                kind = rng.randrange(3)
+                if kind == 0:
+                    name = name[:i] + rng.choice(letters) + name[i + 1:]
+                elif kind == 1:
+                    name = name[:i] + name[i + 1:]
+                else:
+                    name = name[:i] + rng.choice(letters) + name[i:]
+            misspelt.append(name)
+
+        found = 0
+        start = time.perf_counter()
+        for name, original in zip(misspelt, names):
+            candidates = index.resolve(name, max_distance=typos)
+            found += any(candidate[2] == original for candidate in candidates)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "directory": directory,
+            "names": len(people),
+            "typos": edits,
+            "max_distance": typos,
+            "build_seconds": build_seconds,
+            "queries": queries,
+            "lookups_per_second": queries / elapsed if elapsed else None,
+            "found": found,
+            "python": sys.version.split()[0]
+        })
+    return results
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of sorted values (nearest rank).
+    """
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))
+    return values[rank]
+
+
+if __name__ == "__main__":
+    main()
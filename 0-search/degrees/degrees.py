@@ -1,6 +1,18 @@
+import argparse
 import csv
 import sys
-
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then reported as None
+    resource = None
+
+import snapshot
+from graph import Graph
+from landmarks import Landmarks
+from lookup import NameIndex
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,11 +24,37 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed graph, used instead of the "movies" and "stars"
+# sets above when data is loaded with compact=True
+graph = None
+
+# Maps person_ids to precomputed (distance, parent_person, parent_movie)
+# search trees over graph (see distances.py)
+trees = {}
+
+# Landmark distances for A* search over graph (see landmarks.py)
+landmark_table = None
 
-def load_data(directory):
+# Sorted name index for non-interactive lookups, built on first use
+name_index = None
+
+
+def load_data(directory, compact=False, cache=False):
     """
     Load data from CSV files into memory.
+
+    If compact is True, star links are stored in a compact Graph instead
+    of per-person and per-movie sets.
+
+    If cache is True, the compact data is also written to a binary snapshot
+    next to the CSV files, and later runs memory-map that snapshot instead
+    of parsing the CSVs until they change. Implies compact.
+
+    Compact loads return a dictionary of load statistics (see load_compact).
     """
+    if compact or cache:
+        return load_compact(directory, cache)
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f: 
         reader = csv.DictReader(f)
@@ -52,15 +90,202 @@ def load_data(directory):
                 pass
 
 
+def load_compact(directory, cache=False):
+    """
+    Load data from CSV files into memory, keeping star links in a
+    compact Graph indexed by dense integers.
+
+    The CSV files are streamed row by row with csv.reader, and stars.csv
+    is read twice (once to size the graph arrays, once to fill them), so
+    star rows are never held in memory. Returns a dictionary of load
+    statistics: rows read, seconds, rows per second and peak memory.
+    """
+    global graph
+    start = time.perf_counter()
+
+    if cache:
+        loaded = snapshot.load(directory)
+        if loaded is not None:
+            graph, columns = loaded
+            load_columns(columns)
+            return load_stats(len(people) + len(movies), start)
+
+    # Load people
+    person_ids = []
+    for id, name, birth in read_columns(f"{directory}/people.csv",
+                                        ("id", "name", "birth")):
+        id = sys.intern(id)
+        if id not in people:
+            person_ids.append(id)
+        people[id] = {
+            "name": name,
+            "birth": sys.intern(birth)
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {id}
+        else:
+            names[name.lower()].add(id)
+
+    # Load movies
+    movie_ids = []
+    for id, title, year in read_columns(f"{directory}/movies.csv",
+                                        ("id", "title", "year")):
+        id = sys.intern(id)
+        if id not in movies:
+            movie_ids.append(id)
+        movies[id] = {
+            "title": title,
+            "year": sys.intern(year)
+        }
+
+    person_index = {id: i for i, id in enumerate(person_ids)}
+    movie_index = {id: i for i, id in enumerate(movie_ids)}
+    star_rows = 0
+
+    def edges():
+        """
+        Streams (person, movie) index pairs from stars.csv.
+        """
+        nonlocal star_rows
+        star_rows = 0
+        for person_id, movie_id in read_columns(f"{directory}/stars.csv",
+                                                ("person_id", "movie_id")):
+            star_rows += 1
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is not None and movie is not None:
+                yield person, movie
+
+    graph = Graph.from_passes(person_ids, movie_ids, edges, person_index,
+                              movie_index)
+
+    if cache:
+        columns = {
+            "person_ids": person_ids,
+            "names": [people[id]["name"] for id in person_ids],
+            "births": [people[id]["birth"] for id in person_ids],
+            "movie_ids": movie_ids,
+            "titles": [movies[id]["title"] for id in movie_ids],
+            "years": [movies[id]["year"] for id in movie_ids]
+        }
+        try:
+            snapshot.save(directory, graph, columns)
+        except OSError:
+            # A read-only data directory only costs us the cache
+            pass
+
+    # Stars are read twice, so count them twice towards throughput
+    return load_stats(len(people) + len(movies) + 2 * star_rows, start)
+
+
+def read_columns(path, columns):
+    """
+    Yields tuples of the named columns from each row of a CSV file.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        indexes = [header.index(column) for column in columns]
+        for row in reader:
+            yield tuple(row[i] for i in indexes)
+
+
+def load_stats(rows, start):
+    """
+    Returns load statistics for rows read since start.
+    """
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else None,
+        "peak_memory": peak_memory()
+    }
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in bytes,
+    or None if it is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load_landmarks(directory, count=16):
+    """
+    Loads the landmark table stored next to the CSV files, choosing and
+    storing count landmarks first if there is no up-to-date table or it
+    was chosen for a different count. Requires data loaded with
+    compact=True.
+    """
+    global landmark_table
+    landmark_table = Landmarks.load(directory)
+    if landmark_table is None or landmark_table.requested != count:
+        landmark_table = Landmarks.choose(graph, count)
+        try:
+            landmark_table.save(directory)
+        except OSError:
+            pass
+
+
+def load_columns(columns):
+    """
+    Fills people, names and movies from snapshot columns.
+    """
+    for id, name, birth in zip(columns["person_ids"], columns["names"],
+                               columns["births"]):
+        people[id] = {
+            "name": name,
+            "birth": birth
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {id}
+        else:
+            names[name.lower()].add(id)
+
+    for id, title, year in zip(columns["movie_ids"], columns["titles"],
+                               columns["years"]):
+        movies[id] = {
+            "title": title,
+            "year": year
+        }
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large" 
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two actors."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph as compact integer arrays")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse a binary snapshot of the CSV files")
+    parser.add_argument("--landmarks", type=int, metavar="K",
+                        help="search with A* over K landmark bounds "
+                             "(implies --compact)")
+    parser.add_argument("--stats", action="store_true",
+                        help="report load throughput and peak memory "
+                             "(implies --compact)")
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    stats = load_data(
+        args.directory, cache=args.cache,
+        compact=args.compact or args.stats or bool(args.landmarks)
+    )
+    if args.landmarks:
+        load_landmarks(args.directory, args.landmarks)
     print("Data loaded.")
+    if args.stats:
+        peak = stats["peak_memory"]
+        print(f"{stats['rows']} rows in {stats['seconds']:.2f}s "
+              f"({stats['rows_per_second']:.0f} rows/s), peak memory "
+              f"{'unknown' if peak is None else f'{peak / 2 ** 20:.1f} MiB'}")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +294,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -84,13 +309,39 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If bidirectional is True, the search grows frontiers from both
+    the source and the target (see bidirectional_path). If a landmark
+    table is loaded, an A* search over its bounds is used instead.
+
     If no possible path, returns None.
     """
+    if graph is not None:
+        if source in trees:
+            distance, parent_person, parent_movie = trees[source]
+            person = graph.person_index[target]
+            if distance[person] == -1:
+                return None
+            path = graph.trace(person, parent_person, parent_movie)
+        elif landmark_table is not None:
+            path = landmark_table.shortest_path(graph,
+                                                graph.person_index[source],
+                                                graph.person_index[target])
+        else:
+            path = graph.shortest_path(graph.person_index[source],
+                                       graph.person_index[target],
+                                       bidirectional)
+        if path is None:
+            return None
+        return [(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in path]
+
+    if bidirectional:
+        return bidirectional_path(source, target)
 
     # Make the initial state a node
     sourceNode = Node(source)
@@ -99,10 +350,9 @@ def shortest_path(source, target):
     # Add initial state node to frontier (using QueueFrontier for BFS)
     frontier = QueueFrontier()
     frontier.add(sourceNode)
-    state_frontier = [sourceNode.get_state()]
 
     # Keep track of explored state
-    explored = []
+    explored = set()
 
     while True:
 
@@ -111,9 +361,9 @@ def shortest_path(source, target):
             return None
 
         # Check if the goal state is in the frontier
-        if targetNode.get_state() in state_frontier:
+        if frontier.contains_state(targetNode.get_state()):
             consideredNode = frontier.target_found(targetNode) 
-            explored.append(consideredNode.get_state())
+            explored.add(consideredNode.get_state())
             
             # List for the path
             path = []
@@ -130,19 +380,102 @@ def shortest_path(source, target):
 
         # Move one node in frontier to explored node (this node will now be considered)
         consideredNode = frontier.removeNode()
-        explored.append(consideredNode.get_state())
+        explored.add(consideredNode.get_state())
 
         # Find the neighbour of the considered node that hasn't been explored and add them to the frontier
         for movie, neighbour in neighbors_for_person(consideredNode.get_state()):
             if not frontier.contains_state(neighbour) and neighbour not in explored:
                 neighbourNode = Node(neighbour, consideredNode, movie)
                 frontier.add(neighbourNode)
-                state_frontier.append(neighbourNode.get_state())
-                
+
                 if neighbour == targetNode.get_state():
                     targetNode = neighbourNode
 
 
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends at once and stopping when the two searches meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie_id, person_id) that reached it,
+    # one map for the search from the source and one for the search from
+    # the target
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Always expand the smaller layer, so hub actors are reached from
+        # whichever side is cheaper
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(layer, parents, other_parents):
+    """
+    Expands every person in a breadth-first layer, recording parents for
+    newly reached people. Returns the next layer and the first person also
+    reached by the other search, or None if the searches have not met.
+
+    Stopping at the first meeting is still optimal, as explained for
+    Graph.expand in graph.py.
+    """
+    next_layer = []
+
+    for person_id in layer:
+        for movie_id, neighbour in neighbors_for_person(person_id):
+            if neighbour in parents:
+                continue
+            parents[neighbour] = (movie_id, person_id)
+            next_layer.append(neighbour)
+            if neighbour in other_parents:
+                return next_layer, neighbour
+
+    return next_layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the forward and backward half-paths through the meeting person
+    into a single list of (movie_id, person_id) pairs from source to target.
+    """
+    # Trace back from the meeting person to the source
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    # Walk forward from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -169,11 +502,78 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def resolve_name(name, limit=10, max_distance=2):
+    """
+    Returns up to limit ranked candidates for a name without prompting,
+    as (distance, person_id, name, birth, movie_count) tuples.
+
+    Exact (case-insensitive) matches come first with distance 0; if there
+    are none, names within max_distance edits are returned instead.
+    """
+    global name_index
+    if name_index is None or len(name_index) != len(people):
+        name_index = NameIndex(
+            (person_id, person["name"], person["birth"],
+             movie_count(person_id))
+            for person_id, person in people.items()
+        )
+    return name_index.resolve(name, limit, max_distance)
+
+
+class Unresolved(ValueError):
+    """
+    Raised when a name does not match exactly one person.
+    """
+    def __init__(self, message, candidates):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def resolve_person(person):
+    """
+    Returns the person id for a person id or an exact, unambiguous name.
+    """
+    if not isinstance(person, str):
+        raise TypeError(
+            f"person must be a name or id, not {type(person).__name__}"
+        )
+    if person in people:
+        return person
+    matches = resolve_name(person)
+    exact = [match for match in matches if match[0] == 0]
+    if len(exact) == 1:
+        return exact[0][1]
+
+    candidates = [
+        {"person_id": person_id, "name": name, "birth": birth,
+         "movies": movies, "distance": distance}
+        for distance, person_id, name, birth, movies in matches
+    ]
+    if exact:
+        raise Unresolved(f"ambiguous name: {person}", candidates)
+    raise Unresolved(f"person not found: {person}", candidates)
+
+
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return len(graph.movies_of(graph.person_index[person_id]))
+    return len(people[person_id]["movies"])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in graph.neighbors(
+                    graph.person_index[person_id]
+                )}
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,180 @@
+"""
+Precomputes single-source breadth-first search trees for degrees.
+
+Each tree holds the distance and parent pointers from one source person to
+everyone reachable, so "how far is everyone from X" is answered in one pass
+and shortest_path from a precomputed source is a parent-pointer walk.
+Trees are stored as binary files in a "distances" directory next to the
+CSV files and are keyed like the data snapshot, so they are ignored once
+the CSVs change.
+
+Usage:
+    python distances.py [directory] SOURCE [SOURCE ...] [--workers N]
+"""
+
+import argparse
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import snapshot
+
+SUBDIRECTORY = "distances"
+MAGIC = b"DDST"
+VERSION = 1
+
+# Magic, version, source key of the CSV files, number of people and the
+# source person index
+HEADER = struct.Struct("=4sI" + "QQ" * len(snapshot.SOURCES) + "QQ")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute distances from source people."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("sources", nargs="+",
+                        help="person ids or exact names of source people")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    args = parser.parse_args()
+
+    import degrees
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, cache=True)
+    print("Data loaded.", file=sys.stderr)
+
+    try:
+        sources = [
+            degrees.graph.person_index[degrees.resolve_person(source)]
+            for source in args.sources
+        ]
+    except ValueError as e:
+        sys.exit(str(e))
+
+    start = time.perf_counter()
+    for source, reachable, farthest in compute_all(
+        degrees.graph, args.directory, sources, args.workers
+    ):
+        print(f"{degrees.graph.person_ids[source]}: {reachable} reachable, "
+              f"farthest at {farthest} degrees")
+    elapsed = time.perf_counter() - start
+    print(f"{len(sources)} sources in {elapsed:.2f}s", file=sys.stderr)
+
+
+# Graph and output directory shared with forked workers
+shared = {}
+
+
+def compute_all(graph, directory, sources, workers=1):
+    """
+    Computes and saves the tree of every source person index, running
+    sources in parallel worker processes. The graph is shared with the
+    workers copy-on-write through fork, or through the memory-mapped
+    snapshot if it was loaded from one.
+
+    Yields (source, reachable, farthest) for each source in order.
+    """
+    shared["graph"] = graph
+    shared["directory"] = directory
+    os.makedirs(os.path.join(directory, SUBDIRECTORY), exist_ok=True)
+
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            yield from pool.map(compute, sources)
+    else:
+        yield from map(compute, sources)
+
+
+def compute(source):
+    """
+    Computes and saves the tree of one source person index.
+    Returns (source, reachable, farthest).
+    """
+    graph = shared["graph"]
+    tree = graph.single_source(source)
+    save(shared["directory"], graph.person_ids[source], source, tree)
+    distance = tree[0]
+    reachable = len(distance) - distance.count(-1)
+    return source, reachable, max(distance)
+
+
+def path(directory, person_id):
+    return os.path.join(directory, SUBDIRECTORY, f"{person_id}.dist")
+
+
+def save(directory, person_id, source, tree):
+    """
+    Writes the (distance, parent_person, parent_movie) tree of source.
+    """
+    target = path(directory, person_id)
+    temp = f"{target}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, *snapshot.source_key(directory),
+                            len(tree[0]), source))
+        for values in tree:
+            f.write(values.tobytes())
+    os.replace(temp, target)
+
+
+def load(directory, person_id):
+    """
+    Memory-maps the stored tree of a person and returns
+    (distance, parent_person, parent_movie), or None if there is no tree
+    or it is out of date.
+    """
+    try:
+        with open(path(directory, person_id), "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < HEADER.size:
+        return None
+    header = HEADER.unpack_from(mapped)
+    magic, version = header[:2]
+    key = header[2:-2]
+    num_people = header[-2]
+    if (magic != MAGIC or version != VERSION
+            or key != snapshot.source_key(directory)
+            or len(mapped) != HEADER.size + 3 * 4 * num_people):
+        return None
+
+    view = memoryview(mapped)
+    tree = []
+    offset = HEADER.size
+    for _ in range(3):
+        end = offset + 4 * num_people
+        tree.append(view[offset:end].cast("i"))
+        offset = end
+    return tuple(tree)
+
+
+def load_all(directory):
+    """
+    Returns a dictionary mapping person ids to every stored, up-to-date
+    tree in directory.
+    """
+    trees = {}
+    try:
+        filenames = os.listdir(os.path.join(directory, SUBDIRECTORY))
+    except OSError:
+        return trees
+    for filename in filenames:
+        if filename.endswith(".dist"):
+            person_id = filename[:-len(".dist")]
+            tree = load(directory, person_id)
+            if tree is not None:
+                trees[person_id] = tree
+    return trees
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+from array import array
+
+
+class Graph():
+    """
+    Compact person/movie graph for the degrees dataset.
+
+    People and movies are numbered with dense integers in load order, and
+    the star links are kept in compressed sparse row (CSR) form: the movies
+    of person p are person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and the stars of movie m are
+    movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_people, person_index=None,
+                 movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Maps IMDb ids back to their dense integer index
+        if person_index is None:
+            person_index = {id: i for i, id in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {id: i for i, id in enumerate(movie_ids)}
+        self.person_index = person_index
+        self.movie_index = movie_index
+
+    @classmethod
+    def from_passes(cls, person_ids, movie_ids, edges, person_index=None,
+                    movie_index=None):
+        """
+        Builds a graph in two passes over a stream of (person, movie) index
+        pairs, without holding the pairs in memory. edges is called once
+        per pass and must return the same pairs each time.
+        """
+        # First pass: count movies per person and stars per movie
+        person_offsets = array("i", [0]) * (len(person_ids) + 1)
+        movie_offsets = array("i", [0]) * (len(movie_ids) + 1)
+        for person, movie in edges():
+            person_offsets[person + 1] += 1
+            movie_offsets[movie + 1] += 1
+        for i in range(len(person_ids)):
+            person_offsets[i + 1] += person_offsets[i]
+        for i in range(len(movie_ids)):
+            movie_offsets[i + 1] += movie_offsets[i]
+
+        # Second pass: place every pair at the next free slot of its row
+        person_movies = array("i", [0]) * person_offsets[-1]
+        movie_people = array("i", [0]) * movie_offsets[-1]
+        person_next = array("i", person_offsets)
+        movie_next = array("i", movie_offsets)
+        for person, movie in edges():
+            person_movies[person_next[person]] = movie
+            person_next[person] += 1
+            movie_people[movie_next[movie]] = person
+            movie_next[movie] += 1
+
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_people, person_index, movie_index)
+
+    def num_people(self):
+        return len(self.person_ids)
+
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """
+        Returns the movie indexes a person starred in.
+        """
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def shortest_path(self, source, target, bidirectional=False):
+        """
+        Returns the shortest list of (movie, person) index pairs
+        that connect the source to the target, or None if not connected.
+        """
+        if source == target:
+            return []
+        if bidirectional:
+            return self.bidirectional_path(source, target)
+
+        parent_person, parent_movie = self.empty_parents()
+        parent_person[source] = source
+        layer = [source]
+
+        while layer:
+            next_layer = []
+            for person in layer:
+                self.expand(person, parent_person, parent_movie, next_layer,
+                            None)
+                if parent_person[target] != -1:
+                    return self.trace(target, parent_person, parent_movie)
+            layer = next_layer
+
+        return None
+
+    def bidirectional_path(self, source, target):
+        """
+        Same as shortest_path, but grows breadth-first layers from both the
+        source and the target and stops once the two searches meet.
+        """
+        forward_person, forward_movie = self.empty_parents()
+        backward_person, backward_movie = self.empty_parents()
+        forward_person[source] = source
+        backward_person[target] = target
+        forward_layer = [source]
+        backward_layer = [target]
+
+        while forward_layer and backward_layer:
+
+            # Always expand the smaller layer
+            if len(forward_layer) <= len(backward_layer):
+                next_layer = []
+                meeting = None
+                for person in forward_layer:
+                    meeting = self.expand(
+                        person, forward_person, forward_movie, next_layer,
+                        backward_person
+                    )
+                    if meeting is not None:
+                        break
+                forward_layer = next_layer
+            else:
+                next_layer = []
+                meeting = None
+                for person in backward_layer:
+                    meeting = self.expand(
+                        person, backward_person, backward_movie, next_layer,
+                        forward_person
+                    )
+                    if meeting is not None:
+                        break
+                backward_layer = next_layer
+
+            if meeting is not None:
+                path = self.trace(meeting, forward_person, forward_movie)
+                person = meeting
+                while backward_person[person] != person:
+                    path.append((backward_movie[person],
+                                 backward_person[person]))
+                    person = backward_person[person]
+                return path
+
+        return None
+
+    def single_source(self, source):
+        """
+        Runs one breadth-first search from source over the whole graph.
+
+        Returns (distance, parent_person, parent_movie) arrays indexed by
+        person, with distance -1 and parents -1 for unreachable people.
+        The source is its own parent, so trace works on the result.
+        """
+        parent_person, parent_movie = self.empty_parents()
+        distance = array("i", parent_person)
+        parent_person[source] = source
+        distance[source] = 0
+        layer = [source]
+        depth = 0
+
+        while layer:
+            depth += 1
+            next_layer = []
+            for person in layer:
+                self.expand(person, parent_person, parent_movie, next_layer,
+                            None)
+            for person in next_layer:
+                distance[person] = depth
+            layer = next_layer
+
+        return distance, parent_person, parent_movie
+
+    def expand(self, person, parent_person, parent_movie, next_layer,
+               other_person):
+        """
+        Records parents for every unreached neighbour of person and appends
+        them to next_layer. If other_person is given, returns the first
+        neighbour already reached by the other search, otherwise None.
+
+        The searches only ever meet on the other search's newest layer, so
+        every meeting point found while expanding one layer gives a path of
+        the same length and stopping at the first one is still optimal.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                neighbour = movie_people[j]
+                if parent_person[neighbour] != -1:
+                    continue
+                parent_person[neighbour] = person
+                parent_movie[neighbour] = movie
+                next_layer.append(neighbour)
+                if other_person is not None and \
+                        other_person[neighbour] != -1:
+                    return neighbour
+        return None
+
+    def empty_parents(self):
+        """
+        Returns fresh parent-person and parent-movie arrays, with -1
+        marking people that have not been reached.
+        """
+        unreached = array("i", [-1]) * len(self.person_ids)
+        return unreached, array("i", unreached)
+
+    def trace(self, person, parent_person, parent_movie):
+        """
+        Returns the (movie, person) index pairs from the search root
+        to person, following parent pointers.
+        """
+        path = []
+        while parent_person[person] != person:
+            path.append((parent_movie[person], person))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
@@ -0,0 +1,245 @@
+"""
+Landmark-based (ALT) lower bounds for degrees searches.
+
+A few landmark people are chosen up front and their breadth-first
+distances to everyone are stored. For any person v and target t, the
+triangle inequality gives |d(L, t) - d(L, v)| <= d(v, t) for every
+landmark L, so the largest such difference is an admissible, consistent
+A* heuristic. The table is persisted next to the CSV files and keyed like
+the data snapshot.
+
+Usage:
+    python landmarks.py [directory] [--count K]
+"""
+
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+import snapshot
+
+FILENAME = "degrees.landmarks"
+MAGIC = b"DLMK"
+VERSION = 2
+
+# Magic, version, source key of the CSV files, number of people, the
+# number of landmarks asked for and the number chosen, which is smaller if
+# every reachable person became a landmark first
+HEADER = struct.Struct("=4sI" + "QQ" * len(snapshot.SOURCES) + "QQQ")
+
+# Distances are stored as 16-bit integers, with -1 for unreachable people
+TYPECODE = "h"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute landmark distances for A* search."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmark people")
+    args = parser.parse_args()
+
+    import degrees
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, cache=True)
+    print("Data loaded.", file=sys.stderr)
+
+    start = time.perf_counter()
+    table = Landmarks.choose(degrees.graph, args.count)
+    table.save(args.directory)
+    elapsed = time.perf_counter() - start
+    for landmark in table.landmarks:
+        person_id = degrees.graph.person_ids[landmark]
+        print(f"{person_id}: {degrees.people[person_id]['name']}")
+    print(f"{len(table.landmarks)} landmarks in {elapsed:.2f}s",
+          file=sys.stderr)
+
+
+class Landmarks():
+    def __init__(self, landmarks, distances, requested=None):
+        """
+        landmarks is a list of person indexes, and distances[i][v] is the
+        number of degrees from landmarks[i] to person v, or -1. requested
+        is how many landmarks were asked for, which is more than were found
+        if every reachable person became one.
+        """
+        self.landmarks = landmarks
+        self.requested = len(landmarks) if requested is None else requested
+        self.distances = distances
+
+    @classmethod
+    def choose(cls, graph, count):
+        """
+        Chooses count landmarks by farthest-point selection: the person in
+        the most movies first, then repeatedly the person farthest from
+        every landmark chosen so far, among people they can reach.
+        """
+        if graph.num_people() == 0:
+            return cls([], [], count)
+
+        offsets = graph.person_offsets
+        first = max(range(graph.num_people()),
+                    key=lambda person: offsets[person + 1] - offsets[person])
+        landmarks = [first]
+        distances = []
+        closest = None
+
+        while True:
+            distance = graph.single_source(landmarks[-1])[0]
+            distances.append(array(TYPECODE, distance))
+            if closest is None:
+                closest = array("i", distance)
+            else:
+                for person, d in enumerate(distance):
+                    if d != -1 and (closest[person] == -1
+                                    or d < closest[person]):
+                        closest[person] = d
+            if len(landmarks) == count:
+                break
+
+            farthest = max(range(len(closest)), key=closest.__getitem__)
+            if closest[farthest] <= 0:
+                break
+            landmarks.append(farthest)
+
+        return cls(landmarks, distances, count)
+
+    def bound(self, person, target_distances):
+        """
+        Returns a lower bound on the degrees from person to the target
+        whose landmark distances are target_distances, or None if the two
+        are known not to be connected.
+        """
+        best = 0
+        for distance, target in zip(self.distances, target_distances):
+            d = distance[person]
+            if (d == -1) != (target == -1):
+                return None
+            difference = d - target if d > target else target - d
+            if difference > best:
+                best = difference
+        return best
+
+    def shortest_path(self, graph, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs from source
+        to target using A* with landmark bounds, or None if not connected.
+        """
+        path, expanded = self.search(graph, source, target)
+        return path
+
+    def search(self, graph, source, target):
+        """
+        Same as shortest_path, but returns (path, expanded), where expanded
+        is the number of people taken off the open list.
+        """
+        target_distances = [distance[target] for distance in self.distances]
+        estimate = self.bound(source, target_distances)
+        if estimate is None:
+            return None, 0
+
+        parent_person, parent_movie = graph.empty_parents()
+        cost = {source: 0}
+        parent_person[source] = source
+
+        # Entries are (estimate, -cost, person): among equal estimates the
+        # deepest person goes first, which matters with unit step costs
+        # where many people tie
+        open_list = [(estimate, 0, source)]
+        expanded = 0
+
+        person_offsets = graph.person_offsets
+        person_movies = graph.person_movies
+        movie_offsets = graph.movie_offsets
+        movie_people = graph.movie_people
+
+        while open_list:
+            _, g, person = heapq.heappop(open_list)
+            g = -g
+            if g > cost[person]:
+                continue
+            expanded += 1
+            if person == target:
+                return graph.trace(target, parent_person, parent_movie), \
+                    expanded
+
+            g += 1
+            for i in range(person_offsets[person],
+                           person_offsets[person + 1]):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbour = movie_people[j]
+                    if neighbour in cost and cost[neighbour] <= g:
+                        continue
+                    cost[neighbour] = g
+                    parent_person[neighbour] = person
+                    parent_movie[neighbour] = movie
+                    heapq.heappush(open_list, (
+                        g + self.bound(neighbour, target_distances),
+                        -g, neighbour
+                    ))
+
+        return None, expanded
+
+    def save(self, directory):
+        """
+        Writes the landmark table next to the CSV files in directory.
+        """
+        path = os.path.join(directory, FILENAME)
+        temp = f"{path}.{os.getpid()}.tmp"
+        num_people = len(self.distances[0]) if self.distances else 0
+        with open(temp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, *snapshot.source_key(directory),
+                                num_people, self.requested,
+                                len(self.landmarks)))
+            f.write(array("q", self.landmarks).tobytes())
+            for distance in self.distances:
+                f.write(array(TYPECODE, distance).tobytes())
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory-maps the landmark table in directory, or returns None if
+        there is none or it is out of date.
+        """
+        try:
+            with open(os.path.join(directory, FILENAME), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(mapped) < HEADER.size:
+            return None
+        header = HEADER.unpack_from(mapped)
+        magic, version = header[:2]
+        key = header[2:-3]
+        num_people, requested, count = header[-3:]
+        size = array(TYPECODE).itemsize
+        if (magic != MAGIC or version != VERSION
+                or key != snapshot.source_key(directory)
+                or len(mapped) != HEADER.size + 8 * count
+                + size * count * num_people):
+            return None
+
+        view = memoryview(mapped)
+        offset = HEADER.size
+        landmarks = list(view[offset:offset + 8 * count].cast("q"))
+        offset += 8 * count
+        distances = []
+        for _ in range(count):
+            end = offset + size * num_people
+            distances.append(view[offset:end].cast(TYPECODE))
+            offset = end
+        return cls(landmarks, distances, requested)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Non-interactive name lookup for degrees.
+
+NameIndex keeps every lowercase name in one sorted list, which doubles as
+an implicit trie: names sharing a prefix sit next to each other, so prefix
+searches are two bisections and edit-distance searches can reuse work for
+shared prefixes and skip whole prefix ranges that are already too far away.
+
+Edit-distance searches for longer names first narrow the candidates with
+an index of trigrams by position. Each edit changes at most three of a
+name's trigrams and moves the others by at most one place, so a name
+within d edits of the query keeps all but 3d of the query's trigrams, each
+within d places of where the query has it. Only names with enough of the
+query's trigrams near their place in the query are compared with it.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Sorts after any character that appears in a name, so prefix + END is an
+# upper bound for every name starting with prefix
+END = "\U0010ffff"
+
+# Length of the grams indexed, and the padding that marks the start and
+# end of a name so its first and last characters are in as many grams as
+# the others
+GRAM = 3
+PAD = "\x00" * (GRAM - 1)
+
+
+class NameIndex():
+    def __init__(self, entries):
+        """
+        Builds an index from (person_id, name, birth, movie_count) entries.
+        """
+        entries = sorted(entries, key=lambda entry: entry[1].lower())
+        self.keys = [entry[1].lower() for entry in entries]
+        self.entries = entries
+
+        # Built on the first edit-distance search: the distinct names
+        # numbered shortest first, as the position in keys of the first of
+        # each; the first number of a name of each length or longer; and
+        # the numbers of the names with each (trigram, place in the name)
+        self.distinct = None
+        self.length_starts = None
+        self.grams = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def exact(self, name):
+        """
+        Returns the entries whose name matches exactly, ignoring case.
+        """
+        name = name.lower()
+        start = bisect_left(self.keys, name)
+        end = start
+        while end < len(self.keys) and self.keys[end] == name:
+            end += 1
+        return self.entries[start:end]
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns the entries whose name starts with prefix, ignoring case,
+        ranked by movie count.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + END, start)
+        matches = sorted(self.entries[start:end],
+                         key=lambda entry: (-entry[3], entry[1]))
+        return matches[:limit]
+
+    def fuzzy(self, name, max_distance=2):
+        """
+        Returns (distance, entry) pairs for every name within max_distance
+        edits (insertions, deletions or substitutions) of name.
+        """
+        query = name.lower()
+        grams_of_query = grams(query)
+
+        # Short queries keep too few trigrams for the filter to rule
+        # anything out
+        if len(grams_of_query) <= GRAM * max_distance:
+            return self.walk(query, max_distance)
+
+        if self.grams is None:
+            self.build_grams()
+
+        # Names of about the query's length with each of its trigrams
+        # within max_distance places of where the query has it. Names are
+        # numbered by length, so each list is cut to the right lengths by
+        # bisection
+        starts = self.length_starts
+        low = starts[min(max(len(query) - max_distance, 0), len(starts) - 1)]
+        high = starts[min(len(query) + max_distance + 1, len(starts) - 1)]
+        places = []
+        for place, gram in enumerate(grams_of_query):
+            found = []
+            for shift in range(place - max_distance,
+                               place + max_distance + 1):
+                posting = self.grams.get((gram, shift))
+                if posting is not None:
+                    start = bisect_left(posting, low)
+                    end = bisect_left(posting, high, start)
+                    if start < end:
+                        found.append(posting[start:end])
+            places.append((sum(map(len, found)), found))
+        places.sort(key=lambda place: place[0])
+
+        # A match has at least threshold of the query's places, so at least
+        # needed of the rarest ones; counting only those skips the longest
+        # lists. A name with a trigram twice in reach is counted twice,
+        # which only lets more names through
+        threshold = len(grams_of_query) - GRAM * max_distance
+        needed = (threshold + 1) // 2
+        counted = places[:len(places) - threshold + needed]
+        counts = Counter()
+        for _, found in counted:
+            for posting in found:
+                counts.update(posting)
+
+        # Names with needed of the counted places have one of the rarest
+        # len(counted) - needed + 1, so only those need their count checked
+        candidates = set()
+        for _, found in counted[:len(counted) - needed + 1]:
+            for posting in found:
+                candidates.update(posting)
+
+        keys = self.keys
+        distance = distance_from(query, max_distance)
+        matches = []
+        for number in candidates:
+            if counts[number] < needed:
+                continue
+            i = self.distinct[number]
+            key = keys[i]
+            d = distance(key)
+            if d > max_distance:
+                continue
+
+            # Only the first of equal keys is numbered
+            while i < len(keys) and keys[i] == key:
+                matches.append((d, self.entries[i]))
+                i += 1
+        return matches
+
+    def build_grams(self):
+        """
+        Numbers the distinct keys by length and indexes their trigrams.
+        """
+        keys = self.keys
+        firsts = [i for i, key in enumerate(keys)
+                  if i == 0 or key != keys[i - 1]]
+        firsts.sort(key=lambda i: len(keys[i]))
+        self.distinct = array("i", firsts)
+
+        longest = len(keys[firsts[-1]]) if firsts else 0
+        starts = array("i", [len(firsts)] * (longest + 2))
+        for number in range(len(firsts) - 1, -1, -1):
+            starts[len(keys[firsts[number]])] = number
+        for length in range(longest, -1, -1):
+            starts[length] = min(starts[length], starts[length + 1])
+        self.length_starts = starts
+
+        index = {}
+        for number, i in enumerate(firsts):
+            for place, gram in enumerate(grams(keys[i])):
+                posting = index.get((gram, place))
+                if posting is None:
+                    posting = index[gram, place] = array("i")
+                posting.append(number)
+        self.grams = index
+
+    def walk(self, query, max_distance=2):
+        """
+        Same as fuzzy for a lowercase query, but walks every key in order
+        instead of filtering by trigrams.
+        """
+        keys = self.keys
+        matches = []
+
+        # rows[j] is the edit distance row after the first j characters of
+        # the previous key, as in a depth-first walk down a trie. Distances
+        # above max_distance are all stored as cap
+        cap = max_distance + 1
+        rows = [[min(k, cap) for k in range(len(query) + 1)]]
+        previous = ""
+        i = 0
+
+        while i < len(keys):
+            key = keys[i]
+
+            # Reuse the rows for the prefix shared with the previous key
+            common = 0
+            limit = min(len(key), len(previous), len(rows) - 1)
+            while common < limit and key[common] == previous[common]:
+                common += 1
+            del rows[common + 1:]
+
+            pruned = False
+            for j in range(common, len(key)):
+                row = next_row(rows[j], j + 1, key[j], query, max_distance)
+                rows.append(row)
+                if min(row) > max_distance:
+
+                    # No key starting with this prefix can get any closer
+                    previous = key[:j + 1]
+                    i = bisect_left(keys, previous + END, i)
+                    pruned = True
+                    break
+
+            if not pruned:
+                if rows[-1][-1] <= max_distance:
+                    matches.append((rows[-1][-1], self.entries[i]))
+                previous = key
+                i += 1
+
+        return matches
+
+    def resolve(self, name, limit=10, max_distance=2):
+        """
+        Returns up to limit ranked candidates for name as
+        (distance, person_id, name, birth, movie_count) tuples.
+
+        Exact matches come first, then the closest fuzzy matches; ties are
+        broken by movie count, so the better-known person ranks first.
+        """
+        matches = [(0, entry) for entry in self.exact(name)]
+        if not matches:
+            matches = self.fuzzy(name, max_distance)
+        matches.sort(key=lambda match: (match[0], -match[1][3], match[1][1]))
+        return [(distance,) + tuple(entry)
+                for distance, entry in matches[:limit]]
+
+
+def next_row(row, depth, character, query, max_distance):
+    """
+    Returns the edit distance row after reading character as the
+    depth-th character of a key.
+
+    Only cells within max_distance of the diagonal can stay within
+    max_distance, so the rest are left at max_distance + 1 unchanged.
+    """
+    cap = max_distance + 1
+    next = [cap] * len(row)
+    start = max(depth - max_distance, 0)
+    end = min(depth + max_distance, len(query))
+    if start == 0:
+        next[0] = depth if depth < cap else cap
+        start = 1
+    for k in range(start, end + 1):
+        cost = row[k - 1] + (query[k - 1] != character)
+        if row[k] + 1 < cost:
+            cost = row[k] + 1
+        if next[k - 1] + 1 < cost:
+            cost = next[k - 1] + 1
+        next[k] = cost if cost < cap else cap
+    return next
+
+
+def grams(key):
+    """
+    Returns the padded trigrams of a key, in order.
+    """
+    padded = PAD + key + PAD
+    return [padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)]
+
+
+def distance_from(query, max_distance):
+    """
+    Returns a function of a key that returns its edit distance from query,
+    or max_distance + 1 if that is larger.
+
+    Uses Myers' bit-parallel algorithm: the differences between adjacent
+    cells of a whole column of the edit distance table are kept as the
+    bits of a few integers, so each character of key costs a handful of
+    integer operations instead of a loop over query.
+    """
+    cap = max_distance + 1
+    if not query:
+        return lambda key: min(len(key), cap)
+
+    # Bit i of positions[c] is set if query[i] is c
+    positions = {}
+    for i, character in enumerate(query):
+        positions[character] = positions.get(character, 0) | 1 << i
+
+    mask = (1 << len(query)) - 1
+    last = 1 << (len(query) - 1)
+
+    def distance(key):
+        plus = mask
+        minus = 0
+        score = len(query)
+        # Each character left in key lowers the score by at most one
+        left = len(key)
+        for character in key:
+            equal = positions.get(character, 0)
+            vertical = equal | minus
+            horizontal = (((equal & plus) + plus) ^ plus) | equal
+            horizontal_plus = minus | (~(horizontal | plus) & mask)
+            horizontal_minus = plus & horizontal
+            if horizontal_plus & last:
+                score += 1
+            elif horizontal_minus & last:
+                score -= 1
+            left -= 1
+            if score - left > max_distance:
+                return cap
+            horizontal_plus = (horizontal_plus << 1 | 1) & mask
+            horizontal_minus = (horizontal_minus << 1) & mask
+            plus = horizontal_minus | (~(vertical | horizontal_plus) & mask)
+            minus = horizontal_plus & vertical
+        return score if score < cap else cap
+
+    return distance
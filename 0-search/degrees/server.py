@@ -0,0 +1,189 @@
+"""
+Answers many degrees queries against one warm copy of the data.
+
+Queries are JSON objects, one per line, such as
+
+    {"source": "Kevin Bacon", "target": "Tom Hanks"}
+
+where source and target are either a person id or a name. Each answer
+is written back as one JSON line, in the same order as the queries. Names
+that don't resolve to exactly one person are answered with an error and a
+ranked list of candidates.
+
+Usage:
+    python server.py [directory] < queries.jsonl > answers.jsonl
+    python server.py [directory] --socket /tmp/degrees.sock
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import degrees
+import distances
+
+# Whether queries use bidirectional search, set once by main before any
+# workers are started so forked workers see the same value
+bidirectional = True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer degrees queries from JSON lines."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--socket",
+                        help="serve queries on this Unix socket path "
+                             "instead of stdin")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes answering queries")
+    parser.add_argument("--bfs", action="store_true",
+                        help="use one-sided breadth-first search")
+    parser.add_argument("--distances", action="store_true",
+                        help="answer from trees precomputed by distances.py "
+                             "where possible")
+    parser.add_argument("--landmarks", type=int, metavar="K",
+                        help="search with A* over K landmark bounds")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, cache=True)
+    if args.distances:
+        degrees.trees.update(distances.load_all(args.directory))
+    if args.landmarks:
+        degrees.load_landmarks(args.directory, args.landmarks)
+    print("Data loaded.", file=sys.stderr)
+
+    global bidirectional
+    bidirectional = not args.bfs
+
+    with make_pool(args.workers) as pool:
+        if args.socket:
+            serve_socket(args.socket, pool)
+        else:
+            answer_stream(sys.stdin, write_stdout, pool)
+
+
+def make_pool(workers):
+    """
+    Returns an executor that answers queries with the given number of
+    workers. Worker processes are forked after the data is loaded, so they
+    share the read-only graph copy-on-write instead of loading it again.
+    """
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        )
+
+    # Without fork each process would have to reload the data, so fall back
+    # to threads sharing this process's copy
+    return ThreadPoolExecutor(max(workers, 1))
+
+
+def answer_stream(lines, write, pool, window=64):
+    """
+    Answers every query line from lines, calling write with each answer
+    line in query order.
+
+    Queries are handed to the pool as they arrive while a separate thread
+    writes answers as soon as they are ready, so a client can wait for each
+    answer before sending its next query. At most window queries are in
+    flight at once.
+    """
+    pending = queue.Queue(window)
+
+    def writer():
+        while True:
+            future = pending.get()
+            if future is None:
+                return
+            try:
+                answer = future.result()
+            except Exception as e:
+                # Never let one query stop the answers to the rest, or
+                # the reader would block once the window fills up
+                answer = json.dumps({"error": str(e)})
+            write(answer + "\n")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for line in lines:
+            if line.strip():
+                pending.put(pool.submit(answer_line, line))
+    finally:
+        pending.put(None)
+        thread.join()
+
+
+def write_stdout(answer):
+    sys.stdout.write(answer)
+    sys.stdout.flush()
+
+
+def serve_socket(path, pool):
+    """
+    Serves queries on a Unix socket until interrupted. Each connection
+    sends query lines and receives answer lines, like stdin and stdout.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode("utf-8") for line in self.rfile)
+            answer_stream(lines, self.write, pool)
+
+        def write(self, answer):
+            self.wfile.write(answer.encode("utf-8"))
+            self.wfile.flush()
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    os.remove(path)
+
+
+def answer_line(line):
+    """
+    Answers one JSON query line, returning one JSON answer line.
+    """
+    try:
+        query = json.loads(line)
+        answer = answer_query(query)
+    except degrees.Unresolved as e:
+        answer = {"error": str(e), "candidates": e.candidates}
+    except (ValueError, TypeError, KeyError) as e:
+        answer = {"error": str(e)}
+    return json.dumps(answer)
+
+
+def answer_query(query):
+    """
+    Returns the answer to one query as a dictionary.
+    """
+    source = degrees.resolve_person(query["source"])
+    target = degrees.resolve_person(query["target"])
+    answer = {"source": source, "target": target}
+
+    path = degrees.shortest_path(source, target, bidirectional)
+    if path is None:
+        answer["degrees"] = None
+        answer["path"] = None
+    else:
+        answer["degrees"] = len(path)
+        answer["path"] = [{"movie_id": movie_id, "person_id": person_id}
+                          for movie_id, person_id in path]
+    return answer
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Binary snapshots of a loaded degrees dataset.
+
+A snapshot is written next to the CSV files and holds the compact Graph
+arrays plus the people and movie columns, so later runs can memory-map it
+instead of parsing the CSVs again. It is keyed by the size and mtime of
+each CSV file and ignored as soon as any of them changes.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+from graph import Graph
+
+FILENAME = "degrees.snapshot"
+MAGIC = b"DEGS"
+VERSION = 1
+
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Magic, version, byte-order check, then (size, mtime) for each source and
+# the number of people, movies and star links
+HEADER = struct.Struct("=4sII" + "QQ" * len(SOURCES) + "QQQ")
+BYTE_ORDER_CHECK = 0x01020304
+
+# People and movie columns, stored as NUL-separated UTF-8 blobs
+COLUMNS = ("person_ids", "names", "births", "movie_ids", "titles", "years")
+
+
+def source_key(directory):
+    """
+    Returns the (size, mtime) of each CSV file in directory.
+    """
+    key = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        key.extend((stat.st_size, stat.st_mtime_ns))
+    return tuple(key)
+
+
+def save(directory, graph, columns):
+    """
+    Writes a snapshot of graph and the people/movie columns to directory.
+    columns maps each name in COLUMNS to a list of strings.
+    """
+    path = os.path.join(directory, FILENAME)
+    temp = f"{path}.{os.getpid()}.tmp"
+
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, BYTE_ORDER_CHECK, *source_key(directory),
+            graph.num_people(), graph.num_movies(), len(graph.person_movies)
+        ))
+        for values in (graph.person_offsets, graph.person_movies,
+                       graph.movie_offsets, graph.movie_people):
+            f.write(array("i", values).tobytes())
+        for column in COLUMNS:
+            blob = "\0".join(columns[column]).encode("utf-8")
+            f.write(struct.pack("=Q", len(blob)))
+            f.write(blob)
+
+    # Replace atomically so a concurrent reader never sees half a snapshot
+    os.replace(temp, path)
+
+
+def load(directory):
+    """
+    Memory-maps the snapshot in directory and returns (graph, columns),
+    or None if there is no snapshot or it is out of date.
+
+    The graph arrays are read-only views into the mapped file.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < HEADER.size:
+        return None
+    header = HEADER.unpack_from(mapped)
+    magic, version, byte_order = header[:3]
+    key = header[3:3 + 2 * len(SOURCES)]
+    num_people, num_movies, num_edges = header[3 + 2 * len(SOURCES):]
+    if (magic != MAGIC or version != VERSION
+            or byte_order != BYTE_ORDER_CHECK or key != source_key(directory)):
+        return None
+
+    view = memoryview(mapped)
+    offset = HEADER.size
+    arrays = []
+    for size in (num_people + 1, num_edges, num_movies + 1, num_edges):
+        end = offset + size * 4
+        arrays.append(view[offset:end].cast("i"))
+        offset = end
+
+    columns = {}
+    for column in COLUMNS:
+        (length,) = struct.unpack_from("=Q", mapped, offset)
+        offset += 8
+        blob = bytes(view[offset:offset + length]).decode("utf-8")
+        count = num_people if column in COLUMNS[:3] else num_movies
+        columns[column] = blob.split("\0") if count else []
+        offset += length
+
+    graph = Graph(columns["person_ids"], columns["movie_ids"], *arrays)
+    return graph, columns
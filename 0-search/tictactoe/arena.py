@@ -0,0 +1,172 @@
+"""
+Headless self-play arena for Tic Tac Toe engines.
+
+Plays games between two engines with no UI, swapping sides every game, and
+reports results, games per second, nodes per second and per-move latency
+percentiles for each engine.
+
+Usage:
+    python arena.py ENGINE ENGINE [--games N] [--seed S] [--json]
+
+Engines: minimax (full tree, no pruning), alphabeta (bitboard search with
+transposition table), book (opening book lookup), random.
+"""
+
+import argparse
+import json
+import random
+import time
+
+import bitboard
+import book
+
+# Random source for the random engine, seeded by run
+rng = random.Random(0)
+
+
+def minimax_engine(x, o):
+    """
+    Plain minimax over the full game tree, with no pruning or caching.
+    """
+    def value(x, o):
+        bitboard.nodes += 1
+        if bitboard.terminal(x, o):
+            return bitboard.utility(x, o)
+        values = [value(*bitboard.play(x, o, cell))
+                  for cell in bitboard.moves(x, o)]
+        return max(values) if bitboard.x_to_move(x, o) else min(values)
+
+    choose = max if bitboard.x_to_move(x, o) else min
+    return choose(bitboard.moves(x, o),
+                  key=lambda cell: value(*bitboard.play(x, o, cell)))
+
+
+def alphabeta_engine(x, o):
+    return bitboard.best_move(x, o)[1]
+
+
+def book_engine(x, o):
+    return book.lookup(x, o)[1]
+
+
+def random_engine(x, o):
+    return rng.choice(bitboard.moves(x, o))
+
+
+ENGINES = {
+    "minimax": minimax_engine,
+    "alphabeta": alphabeta_engine,
+    "book": book_engine,
+    "random": random_engine
+}
+
+
+def play(engines, stats):
+    """
+    Plays one game between engines (X first) and returns the winner,
+    "X", "O" or None. Records each engine's move latencies and nodes in
+    stats.
+    """
+    x = o = 0
+    turn = 0
+    while not bitboard.terminal(x, o):
+        name = engines[turn % 2]
+        nodes = bitboard.nodes
+        start = time.perf_counter()
+        cell = ENGINES[name](x, o)
+        stats[name]["latencies"].append(time.perf_counter() - start)
+        stats[name]["nodes"] += bitboard.nodes - nodes
+        x, o = bitboard.play(x, o, cell)
+        turn += 1
+    return bitboard.winner(x, o)
+
+
+def run(first, second, games, seed=0):
+    """
+    Plays games between two engines, alternating sides, and returns a
+    dictionary of results and per-engine statistics.
+    """
+    rng.seed(seed)
+    stats = {name: {"latencies": [], "nodes": 0} for name in (first, second)}
+
+    # Wins are counted by seat rather than by engine name, so an engine
+    # can play itself
+    wins = {"first": 0, "second": 0, "draw": 0}
+
+    start = time.perf_counter()
+    for game in range(games):
+        engines = (first, second) if game % 2 == 0 else (second, first)
+        winner = play(engines, stats)
+        if winner is None:
+            wins["draw"] += 1
+        elif (winner == "X") == (game % 2 == 0):
+            wins["first"] += 1
+        else:
+            wins["second"] += 1
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "games": games,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else None,
+        "results": wins,
+        "engines": {}
+    }
+    for name, engine in stats.items():
+        latencies = sorted(engine["latencies"])
+        thinking = sum(latencies)
+        report["engines"][name] = {
+            "moves": len(latencies),
+            "nodes": engine["nodes"],
+            "nodes_per_second": engine["nodes"] / thinking
+            if thinking else None,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p90": percentile(latencies, 90),
+            "latency_p99": percentile(latencies, 99),
+            "latency_max": latencies[-1] if latencies else None
+        }
+    return report
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of sorted values (nearest rank).
+    """
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play engines headlessly.")
+    parser.add_argument("first", choices=list(ENGINES))
+    parser.add_argument("second", choices=list(ENGINES))
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true",
+                        help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.first, args.second, args.games, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    results = report["results"]
+    print(f"{report['games']} games in {report['seconds']:.2f}s "
+          f"({report['games_per_second']:.1f} games/s)")
+    print(f"{args.first} {results['first']}, {args.second} "
+          f"{results['second']}, draws {results['draw']}")
+    for name, engine in report["engines"].items():
+        nodes_per_second = engine["nodes_per_second"]
+        print(f"{name}: {engine['moves']} moves, {engine['nodes']} nodes"
+              + ("" if not nodes_per_second
+                 else f" ({nodes_per_second:.0f} nodes/s)")
+              + f", latency p50 {engine['latency_p50'] * 1000:.3f}ms "
+              f"p90 {engine['latency_p90'] * 1000:.3f}ms "
+              f"p99 {engine['latency_p99'] * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Bitboard Tic Tac Toe engine.
+
+Each side's marks are stored as a 9-bit integer, with cell (i, j) at bit
+3 * i + j. Wins are checked against eight precomputed line masks and moves
+are a single bitwise OR, so the search never builds or copies a board.
+"""
+
+import math
+
+FULL = 0b111111111
+
+# Rows, columns and diagonals
+LINES = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+)
+
+# Centre first, then corners, then edges, so good moves are tried early
+# and alpha-beta cuts off sooner
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board, each as a tuple
+    mapping every cell to the cell it moves to.
+    """
+    def rotate(cell):
+        i, j = divmod(cell, 3)
+        return 3 * j + (2 - i)
+
+    def reflect(cell):
+        i, j = divmod(cell, 3)
+        return 3 * i + (2 - j)
+
+    result = []
+    cells = tuple(range(9))
+    for _ in range(4):
+        result.append(cells)
+        result.append(tuple(reflect(cell) for cell in cells))
+        cells = tuple(rotate(cell) for cell in cells)
+    return result
+
+
+SYMMETRIES = symmetries()
+
+# INVERSES[s][cell] is the cell that symmetry s moves to cell
+INVERSES = [tuple(symmetry.index(cell) for cell in range(9))
+            for symmetry in SYMMETRIES]
+
+# TABLES[s][bits] is the 9-bit side bits after applying symmetry s
+TABLES = [
+    [sum(1 << symmetry[cell] for cell in range(9) if bits & (1 << cell))
+     for bits in range(FULL + 1)]
+    for symmetry in SYMMETRIES
+]
+
+# Solved positions, keyed by the canonical (mover | opponent << 9) under
+# the board's symmetries, mapping to (value, cell, bound) with value from
+# the mover's point of view and cell in the canonical orientation
+transpositions = {}
+
+# Number of positions negamax has visited, for benchmarks
+nodes = 0
+
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+
+def count(bits):
+    """
+    Returns the number of marks in a 9-bit side.
+    """
+    return bin(bits).count("1")
+
+
+def x_to_move(x, o):
+    """
+    Returns True if X has the next turn.
+    """
+    return count(x) <= count(o)
+
+
+def has_line(bits):
+    """
+    Returns True if a side has three in a row.
+    """
+    for line in LINES:
+        if bits & line == line:
+            return True
+    return False
+
+
+def winner(x, o):
+    """
+    Returns "X" or "O" if that side has three in a row, otherwise None.
+    """
+    if has_line(x):
+        return "X"
+    if has_line(o):
+        return "O"
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if the game is over.
+    """
+    return (x | o) == FULL or has_line(x) or has_line(o)
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won, -1 if O has won, 0 otherwise.
+    """
+    if has_line(x):
+        return 1
+    if has_line(o):
+        return -1
+    return 0
+
+
+def moves(x, o):
+    """
+    Returns the empty cells, in search order.
+    """
+    taken = x | o
+    return [cell for cell in ORDER if not taken & (1 << cell)]
+
+
+def play(x, o, cell):
+    """
+    Returns the (x, o) boards after the side to move takes cell.
+    """
+    bit = 1 << cell
+    if (x | o) & bit:
+        raise ValueError("Invalid action")
+    if x_to_move(x, o):
+        return x | bit, o
+    return x, o | bit
+
+
+def best_move(x, o):
+    """
+    Returns (value, cell) for the side to move, where value is 1 if X
+    wins with best play, -1 if O wins and 0 for a draw, and cell is None
+    if the game is already over.
+    """
+    if terminal(x, o):
+        return utility(x, o), None
+    if x_to_move(x, o):
+        value, cell = negamax(x, o, -math.inf, math.inf)
+        return value, cell
+    value, cell = negamax(o, x, -math.inf, math.inf)
+    return -value, cell
+
+
+def canonical(first, second):
+    """
+    Returns (first, second, symmetry) for the smallest orientation of a
+    pair of sides among all 8 symmetries, where symmetry is the index in
+    SYMMETRIES that maps the given orientation to the canonical one.
+    """
+    best = None
+    for symmetry, table in enumerate(TABLES):
+        key = table[first] | table[second] << 9
+        if best is None or key < best:
+            best = key
+            chosen = symmetry
+    return best & FULL, best >> 9, chosen
+
+
+def negamax(mover, opponent, alpha, beta):
+    """
+    Returns (value, cell) for the side to move, searching with alpha-beta
+    pruning. mover and opponent are the bits of the side to move and the
+    other side; value is from the mover's point of view.
+    """
+    global nodes
+    nodes += 1
+
+    # The opponent just moved, so only they can have completed a line
+    if has_line(opponent):
+        return -1, None
+    taken = mover | opponent
+    if taken == FULL:
+        return 0, None
+
+    # Symmetric positions share one entry, with the cell stored in the
+    # canonical orientation and mapped back on the way out
+    first, second, symmetry = canonical(mover, opponent)
+    key = first | second << 9
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, cell, bound = entry
+        if (bound == EXACT
+                or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)):
+            return value, None if cell is None else INVERSES[symmetry][cell]
+
+    window = alpha
+    value = -math.inf
+    best = None
+    for cell in ORDER:
+        bit = 1 << cell
+        if taken & bit:
+            continue
+        child, _ = negamax(opponent, mover | bit, -beta, -alpha)
+        if -child > value:
+            value, best = -child, cell
+        if value > alpha:
+            alpha = value
+        # 1 is the best value possible, so a win needs no further search
+        if alpha >= beta or value == 1:
+            break
+
+    # A value outside the window is only a bound, unless it is already
+    # the best (1) or worst (-1) possible
+    if value <= window and value > -1:
+        bound = UPPER
+    elif value >= beta and value < 1:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transpositions[key] = (value, SYMMETRIES[symmetry][best], bound)
+    return value, best
@@ -0,0 +1,143 @@
+"""
+Perfect-play lookup table for Tic Tac Toe.
+
+Every reachable position is solved once and stored in book.bin, so
+minimax can answer with a constant-time lookup. Positions are stored only
+in their canonical orientation under the board's 8 symmetries (see
+bitboard.canonical), and moves are mapped back to the orientation asked
+about. A position's index is its board read as a base-3 number, with cell
+3 * i + j as digit 3 * i + j and 0 for empty, 1 for X and 2 for O.
+
+Usage:
+    python book.py    (regenerates book.bin)
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+import bitboard
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+MAGIC = b"TTTB"
+VERSION = 2
+
+# Magic, version and number of positions, followed by the sorted position
+# indexes as 16-bit integers and then one entry byte per position
+HEADER = struct.Struct("<4sBH")
+
+# Each entry byte holds the best cell in its low four bits and value + 1
+# in the next two
+NO_MOVE = 0xF
+
+# Powers of three for each cell
+POWERS = tuple(3 ** cell for cell in range(9))
+
+# Loaded table mapping position indexes to entry bytes, read on first use
+table = None
+
+
+def main():
+    entries = generate()
+    save(entries)
+    print(f"Solved {len(entries)} canonical positions into {PATH}",
+          file=sys.stderr)
+
+
+def index(x, o):
+    """
+    Returns the position index of the (x, o) bitboards.
+    """
+    position = 0
+    for cell in range(9):
+        bit = 1 << cell
+        if x & bit:
+            position += POWERS[cell]
+        elif o & bit:
+            position += 2 * POWERS[cell]
+    return position
+
+
+def generate():
+    """
+    Solves every canonical position reachable from the empty board and
+    returns a dictionary mapping position indexes to entry bytes.
+    """
+    entries = {}
+
+    def visit(x, o):
+        x, o, _ = bitboard.canonical(x, o)
+        position = index(x, o)
+        if position in entries:
+            return
+        value, cell = bitboard.best_move(x, o)
+        entries[position] = (value + 1) << 4 | (
+            NO_MOVE if cell is None else cell
+        )
+        if cell is not None:
+            for move in bitboard.moves(x, o):
+                visit(*bitboard.play(x, o, move))
+
+    visit(0, 0)
+    return entries
+
+
+def save(entries, path=PATH):
+    positions = array("H", sorted(entries))
+    indexes = array("H", positions)
+    if sys.byteorder == "big":
+        indexes.byteswap()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(positions)))
+        f.write(indexes.tobytes())
+        f.write(bytes(entries[position] for position in positions))
+
+
+def load(path=PATH):
+    """
+    Returns the table stored at path, or None if it is missing or was
+    written by another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, count = HEADER.unpack_from(data)
+    if (magic != MAGIC or version != VERSION
+            or len(data) != HEADER.size + 3 * count):
+        return None
+    positions = array("H")
+    positions.frombytes(data[HEADER.size:HEADER.size + 2 * count])
+    if sys.byteorder == "big":
+        positions.byteswap()
+    return dict(zip(positions, data[HEADER.size + 2 * count:]))
+
+
+def lookup(x, o):
+    """
+    Returns (value, cell) for the (x, o) bitboards, as bitboard.best_move
+    does, or None if the position is not in the book.
+    """
+    global table
+    if table is None:
+        table = load()
+        if table is None:
+            # Without a stored book, fall back to building one in memory
+            table = generate()
+
+    x, o, symmetry = bitboard.canonical(x, o)
+    entry = table.get(index(x, o))
+    if entry is None:
+        return None
+    cell = entry & 0xF
+    if cell == NO_MOVE:
+        return (entry >> 4) - 1, None
+    return (entry >> 4) - 1, bitboard.INVERSES[symmetry][cell]
+
+
+if __name__ == "__main__":
+    main()
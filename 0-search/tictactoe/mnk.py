@@ -0,0 +1,309 @@
+"""
+Generalized m,n,k games: an m-by-n board where k in a row wins.
+
+Tic Tac Toe is the 3,3,3 game; 4,4,4 and gomoku-style 7,7,5 boards are too
+big to search exhaustively, so Search runs iterative-deepening alpha-beta
+with move ordering and a heuristic evaluation, and returns the best move
+found within a wall-clock budget.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Directions along which k in a row can be made: across, down and both
+# diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Score of a won position, reduced by the number of moves to reach it so
+# faster wins are preferred
+WIN = 10 ** 9
+
+
+class Game():
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.board = [EMPTY] * (m * n)
+        self.moves = []
+        self.winner = None
+
+        # Every line of k cells that can win, and the lines through
+        # each cell
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(tuple(
+                            (i + di * step) * n + (j + dj * step)
+                            for step in range(k)
+                        ))
+        self.windows_through = [[] for _ in self.board]
+        for window in self.windows:
+            for cell in window:
+                self.windows_through[cell].append(window)
+
+    def copy(self):
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.board = self.board[:]
+        game.moves = self.moves[:]
+        return game
+
+    def player(self):
+        """
+        Returns the player who has the next turn.
+        """
+        return X if len(self.moves) % 2 == 0 else O
+
+    def actions(self):
+        """
+        Returns the empty cells, as indexes i * n + j.
+        """
+        return [cell for cell, mark in enumerate(self.board) if mark is EMPTY]
+
+    def terminal(self):
+        return self.winner is not None or len(self.moves) == len(self.board)
+
+    def play(self, cell):
+        """
+        Makes a move for the player to move. Only lines through the new
+        mark are checked for a win.
+        """
+        if self.board[cell] is not EMPTY or self.winner is not None:
+            raise ValueError("Invalid action")
+        mark = self.player()
+        self.board[cell] = mark
+        self.moves.append(cell)
+        if self.wins_at(cell, mark):
+            self.winner = mark
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        cell = self.moves.pop()
+        self.board[cell] = EMPTY
+        self.winner = None
+
+    def wins_at(self, cell, mark):
+        """
+        Returns True if mark has k in a row through cell.
+        """
+        i, j = divmod(cell, self.n)
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                step_i, step_j = i + sign * di, j + sign * dj
+                while (0 <= step_i < self.m and 0 <= step_j < self.n
+                       and self.board[step_i * self.n + step_j] == mark):
+                    count += 1
+                    step_i += sign * di
+                    step_j += sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def evaluate(self):
+        """
+        Returns a heuristic score from the point of view of the player to
+        move. Each line of k cells holding marks of only one side counts
+        for that side, more the fuller it is.
+        """
+        mover = self.player()
+        score = 0
+        for window in self.windows:
+            mine = theirs = 0
+            for cell in window:
+                mark = self.board[cell]
+                if mark is EMPTY:
+                    continue
+                if mark == mover:
+                    mine += 1
+                else:
+                    theirs += 1
+            if mine and not theirs:
+                score += 4 ** mine
+            elif theirs and not mine:
+                score -= 4 ** theirs
+        return score
+
+    def candidates(self):
+        """
+        Returns the empty cells worth searching: on big boards, only cells
+        next to an existing mark (or the centre of an empty board).
+        """
+        if not self.moves:
+            return [(self.m // 2) * self.n + self.n // 2]
+        if self.m * self.n <= 16:
+            return self.actions()
+        near = set()
+        for cell in self.moves:
+            i, j = divmod(cell, self.n)
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    step_i, step_j = i + di, j + dj
+                    if 0 <= step_i < self.m and 0 <= step_j < self.n:
+                        near.add(step_i * self.n + step_j)
+        return [cell for cell in near if self.board[cell] is EMPTY]
+
+
+class Timeout(Exception):
+    pass
+
+
+class Search():
+    def __init__(self, budget=1.0, max_depth=None):
+        """
+        Searches for at most budget seconds per move (None for no limit),
+        and at most max_depth moves ahead (None for as deep as the board).
+        """
+        self.budget = budget
+        self.max_depth = max_depth
+        self.deadline = None
+        self.nodes = 0
+        self.depth = 0
+
+        # Best move found for each position at any depth, keyed by the
+        # board, used to try that move first
+        self.best_moves = {}
+
+        # History heuristic: how often each cell caused a cutoff
+        self.history = {}
+
+    def best_move(self, game):
+        """
+        Returns (cell, value) for the player to move, where value is from
+        that player's point of view. Searches one move deeper at a time
+        until the budget runs out or the whole game tree has been searched,
+        and returns the best move of the deepest search, improved by any
+        better root move already proven in an unfinished search.
+        """
+        if game.terminal():
+            return None, 0
+
+        self.deadline = (None if self.budget is None
+                         else time.perf_counter() + self.budget)
+        self.nodes = 0
+        self.depth = 0
+        game = game.copy()
+        remaining = len(game.board) - len(game.moves)
+        max_depth = remaining if self.max_depth is None \
+            else min(self.max_depth, remaining)
+
+        # With a single candidate, as on an empty board, the move is forced
+        # and one move ahead is enough to value it
+        candidates = root_order(game)
+        if len(candidates) == 1:
+            max_depth = min(max_depth, 1)
+
+        best = candidates[0]
+        value = 0
+        for depth in range(1, max_depth + 1):
+            try:
+                value, best = self.root(game, depth, best)
+            except Timeout as timeout:
+                if timeout.args:
+                    value, best = timeout.args
+                break
+            self.depth = depth
+            if abs(value) >= WIN - len(game.board):
+                # A forced win or loss was found; deeper searches won't
+                # change it
+                break
+        return best, value
+
+    def root(self, game, depth, previous):
+        """
+        Searches every root move to depth, trying the previous best first.
+        Raises Timeout with (value, cell) if a move better than the first
+        one was already proven when time ran out, or with no arguments.
+        """
+        moves = root_order(game, previous)
+        alpha = -math.inf
+        best = None
+        for cell in moves:
+            game.play(cell)
+            try:
+                value = -self.negamax(game, depth - 1, -math.inf, -alpha, 1)
+            except Timeout:
+                game.undo()
+                if best is None:
+                    raise Timeout()
+                raise Timeout(alpha, best)
+            game.undo()
+            if value > alpha:
+                alpha = value
+                best = cell
+        self.best_moves[tuple(game.board)] = best
+        return alpha, best
+
+    def negamax(self, game, depth, alpha, beta, ply):
+        """
+        Returns the value of the position for the player to move,
+        searching depth moves ahead with alpha-beta pruning.
+        """
+        # A node costs tens of microseconds on small boards and most of a
+        # millisecond on 15,15,5, against well under one to read the clock,
+        # so it is read at every node to stop close to the deadline
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise Timeout()
+
+        if game.winner is not None:
+            # The previous move won
+            return -(WIN - ply)
+        if len(game.moves) == len(game.board):
+            return 0
+        if depth == 0:
+            return game.evaluate()
+
+        key = tuple(game.board)
+        best = None
+        value = -math.inf
+        for cell in self.ordered(game, game.candidates(),
+                                 self.best_moves.get(key)):
+            game.play(cell)
+            child = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.undo()
+            if child > value:
+                value = child
+                best = cell
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                self.history[cell] = self.history.get(cell, 0) + depth * depth
+                break
+        self.best_moves[key] = best
+        return value
+
+    def ordered(self, game, moves, first=None):
+        """
+        Orders moves: the known best move first, then by history score,
+        then by how many winning lines pass through each cell.
+        """
+        def priority(cell):
+            return (cell != first, -self.history.get(cell, 0),
+                    -len(game.windows_through[cell]))
+        return sorted(moves, key=priority)
+
+
+def root_order(game, previous=None):
+    """
+    Orders root moves: the previous best move first, then by how many
+    winning lines pass through each cell. Unlike Search.ordered this does
+    not depend on search history, so every search of the same position
+    tries root moves in the same order and breaks ties the same way.
+    """
+    def priority(cell):
+        return (cell != previous, -len(game.windows_through[cell]), cell)
+    return sorted(game.candidates(), key=priority)
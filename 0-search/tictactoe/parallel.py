@@ -0,0 +1,199 @@
+"""
+Root-parallel search for m,n,k games.
+
+Each iteration of iterative deepening hands the root moves to a pool of
+worker processes. Workers share the best root value found so far, so a
+move searched after a good one only needs to prove it is no better and
+can prune as the sequential search would. A move ordered before the
+current best is searched with a window one point wider, so ties resolve
+to the earliest move just as in the sequential search, and with no time
+budget the chosen move is identical to mnk.Search.
+
+Usage:
+    python parallel.py [--m 5 --n 5 --k 4] [--depth 4] [--workers 1 2 4]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mnk
+
+# Shared between the driver and the worker processes: the best root value
+# found in the current iteration and the root order index of its move
+shared = {}
+
+
+def init_worker(best_value, best_index, budget):
+    shared["value"] = best_value
+    shared["index"] = best_index
+    shared["search"] = mnk.Search(budget)
+
+
+def search_move(game, cell, index, depth, deadline):
+    """
+    Searches one root move to depth. Returns its value, or None if the
+    deadline passed first.
+    """
+    value = shared["value"]
+    with value.get_lock():
+        bound = value.value
+        best_index = shared["index"].value
+
+    # Moves ordered before the current best must beat it only to tie,
+    # since the sequential search would have picked them first
+    if best_index < 0:
+        alpha = -math.inf
+    elif index < best_index:
+        alpha = bound - 1
+    else:
+        alpha = bound
+
+    search = shared["search"]
+    search.deadline = deadline
+    search.nodes = 0
+    game.play(cell)
+    try:
+        result = -search.negamax(game, depth - 1, -math.inf, -alpha, 1)
+    except mnk.Timeout:
+        return None
+
+    with value.get_lock():
+        if result > value.value or (result == value.value
+                                    and index < shared["index"].value):
+            value.value = result
+            shared["index"].value = index
+    return result, search.nodes
+
+
+class ParallelSearch():
+    def __init__(self, workers=None, budget=1.0, max_depth=None):
+        self.workers = workers or os.cpu_count()
+        self.budget = budget
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.depth = 0
+        context = multiprocessing.get_context()
+        self.best_value = context.Value("q", 0)
+        self.best_index = context.Value("i", -1)
+        self.pool = ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=init_worker,
+            initargs=(self.best_value, self.best_index, budget)
+        )
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def best_move(self, game):
+        """
+        Returns (cell, value) for the player to move, like
+        mnk.Search.best_move, searching root moves in parallel.
+        """
+        if game.terminal():
+            return None, 0
+
+        deadline = (None if self.budget is None
+                    else time.perf_counter() + self.budget)
+        self.nodes = 0
+        self.depth = 0
+        remaining = len(game.board) - len(game.moves)
+        max_depth = remaining if self.max_depth is None \
+            else min(self.max_depth, remaining)
+
+        # A forced move needs no deeper search, as in mnk.Search
+        candidates = mnk.root_order(game)
+        if len(candidates) == 1:
+            max_depth = min(max_depth, 1)
+
+        best = candidates[0]
+        value = 0
+        for depth in range(1, max_depth + 1):
+            result = self.root(game, depth, best, deadline)
+            if result is None:
+                break
+            value, best = result
+            self.depth = depth
+            if abs(value) >= mnk.WIN - len(game.board):
+                break
+        return best, value
+
+    def root(self, game, depth, previous, deadline):
+        """
+        Searches every root move to depth across the pool. Returns
+        (value, cell), or None if the deadline passed first.
+        """
+        moves = mnk.root_order(game, previous)
+        with self.best_value.get_lock():
+            # Values are integers, so anything below every real score
+            # stands in for minus infinity until the first move finishes
+            self.best_value.value = -mnk.WIN - 1
+            self.best_index.value = -1
+
+        futures = [
+            self.pool.submit(search_move, game.copy(), cell, index, depth,
+                             deadline)
+            for index, cell in enumerate(moves)
+        ]
+        results = [future.result() for future in futures]
+        if any(result is None for result in results):
+            return None
+
+        alpha = -math.inf
+        best = None
+        for cell, (value, nodes) in zip(moves, results):
+            self.nodes += nodes
+            if value > alpha:
+                alpha = value
+                best = cell
+        return alpha, best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure root-parallel search speedup."
+    )
+    parser.add_argument("--m", type=int, default=5)
+    parser.add_argument("--n", type=int, default=5)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--moves", type=int, default=2,
+                        help="opening moves played before searching")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    game = mnk.Game(args.m, args.n, args.k)
+    for _ in range(args.moves):
+        cell, _ = mnk.Search(budget=None, max_depth=2).best_move(game)
+        game.play(cell)
+
+    search = mnk.Search(budget=None, max_depth=args.depth)
+    start = time.perf_counter()
+    expected = search.best_move(game)
+    sequential = time.perf_counter() - start
+    print(f"sequential: {sequential:.2f}s, move {expected[0]}, "
+          f"value {expected[1]}")
+
+    for workers in sorted(set(args.workers)):
+        with ParallelSearch(workers, budget=None,
+                            max_depth=args.depth) as parallel:
+            start = time.perf_counter()
+            found = parallel.best_move(game)
+            elapsed = time.perf_counter() - start
+        status = "identical" if found == expected else f"DIFFERENT {found}"
+        print(f"{workers} workers: {elapsed:.2f}s, speedup "
+              f"{sequential / elapsed:.2f}x on {os.cpu_count()} cores, "
+              f"{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import pygame
 import sys
+import threading
 import time
 
 import tictactoe as ttt
@@ -19,7 +20,25 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI move is computed on a background thread so the window keeps
+# drawing and handling events while the computer thinks. Starting a new
+# game bumps ai_game, and a move found for an earlier game is dropped.
+# The threads are daemons, so quitting never waits for one
+ai_game = 0
+ai_thinking = False
+ai_result = None
+clock = pygame.time.Clock()
+
+
+def think(board, game):
+    """
+    Searches for the AI move on board and records it as (game, move),
+    unless a new game was started before the search began.
+    """
+    global ai_result
+    if game == ai_game:
+        ai_result = (game, ttt.minimax(board))
 
 while True:
 
@@ -108,15 +127,19 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, starting the search if it isn't running yet
+        # and applying its result once it is done
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if not ai_thinking:
+                ai_thinking = True
+                threading.Thread(target=think, args=(board, ai_game),
+                                 daemon=True).start()
+            elif ai_result is not None:
+                game, move = ai_result
+                ai_result = None
+                ai_thinking = False
+                if game == ai_game:
+                    board = ttt.result(board, move)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,9 +150,13 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
+        # Offer a new game once this one is over, or while the computer
+        # is thinking
+        if game_over or ai_thinking:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
+            again = mediumFont.render(
+                "Play Again" if game_over else "New Game", True, black
+            )
             againRect = again.get_rect()
             againRect.center = againButton.center
             pygame.draw.rect(screen, white, againButton)
@@ -141,6 +168,11 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+
+                    # Drop any search still running for the old game
+                    ai_game += 1
+                    ai_thinking = False
+                    ai_result = None
 
     pygame.display.flip()
+    clock.tick(60)
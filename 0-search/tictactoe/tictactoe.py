@@ -2,8 +2,8 @@
 Tic Tac Toe Player
 """
 
-import math
-import copy
+import bitboard
+import book
 
 X = "X"
 O = "O"
@@ -19,50 +19,45 @@ def initial_state():
             [EMPTY, EMPTY, EMPTY]]
 
 
-def player(board):
+def to_bits(board):
     """
-    Returns player who has the next turn on a board.
+    Returns the (x, o) bitboards for a board, with cell (i, j) at bit
+    3 * i + j (see bitboard.py).
     """
-    Xcounter = 0
-    Ocounter = 0
-
-    for row in board:
-        for cell in row:
+    x = 0
+    o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
             if cell == X:
-                Xcounter += 1
+                x |= 1 << (3 * i + j)
             elif cell == O:
-                Ocounter += 1
-    
-    if Xcounter <= Ocounter:
-        return X
-    else:
-        return O
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if bitboard.x_to_move(*to_bits(board)) else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    possible_action = []
-    for i in range(len(board)):
-        for j in range(len(board[i])):
-            if board[i][j] == EMPTY:
-                possible_action.append((i, j))
-
-    return possible_action
+    return [divmod(cell, 3) for cell in bitboard.moves(*to_bits(board))]
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    board_copy = copy.deepcopy(board)
-
-    if board_copy[action[0]][action[1]] != EMPTY:
+    if board[action[0]][action[1]] != EMPTY:
         raise Exception("Invalid action")
-    else:
-        board_copy[action[0]][action[1]] = player(board)
 
+    board_copy = [row[:] for row in board]
+    board_copy[action[0]][action[1]] = player(board)
     return board_copy
 
 
@@ -70,92 +65,36 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(len(board)):
-        if board[i][0] == board[i][1] == board[i][2] and board[i][0] != EMPTY:
-            return board[i][0]
-        elif board[0][i] == board[1][i] == board[2][i] and board[0][i] != EMPTY:
-            return board[0][i]
-    
-    if board[0][0] == board[1][1] == board[2][2] and board[0][0] != EMPTY:
-        return board[0][0]
-    elif board[2][0] == board[1][1] == board[0][2] and board[0][2] != EMPTY:
-        return board[2][0]
-    else:
-        return None
+    return bitboard.winner(*to_bits(board))
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) is not None or len(actions(board)) == 0:
-        return True
-    else:
-        return False
+    return bitboard.terminal(*to_bits(board))
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
-        return 1
-    elif winner(board) == O:
-        return -1
-    else:
-        return 0
-
-# Based on pseudocode in Lecture 0
-def maxValue(board):
-    value = -1000
-
-    if terminal(board):
-        return utility(board), None
-
-    for action in actions(board):
-        currentValue, prevAction = minValue(result(board, action))
-        # Immediately return value if optimal value (1 for maxValue) 
-        # is the current value, as that value will be maintained 
-        if currentValue == 1:
-            return currentValue, action
-        else:
-            value = max(value, currentValue)
-
-    for action in actions(board):
-        currentValue, prevAction = minValue(result(board, action))
-        if currentValue == value:
-            return currentValue, action
-
-
-# Based on pseudocode in Lecture 0
-def minValue(board):
-    value = 1000
-
-    if terminal(board):
-        return utility(board), None
-
-    for action in actions(board):
-        currentValue, prevAction = maxValue(result(board, action))
-        # Immediately return value if optimal value (-1 for minValue) 
-        # is the current value, as that value will be maintained
-        if currentValue == -1:
-            return currentValue, action
-        else:
-            value = min(value, currentValue)
-    
-    for action in actions(board):
-        currentValue, prevAction = maxValue(result(board, action))
-        if currentValue == value:
-            return currentValue, action
+    return bitboard.utility(*to_bits(board))
 
 
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
+
+    Positions in the opening book are answered by lookup (see book.py);
+    anything else is searched on bitboards with alpha-beta pruning and a
+    transposition table shared across games (see bitboard.py).
     """
-    if player(board) == X:
-        value, action = maxValue(board)
-        return action
-    else:
-        value, action = minValue(board)
-        return action
+    x, o = to_bits(board)
+    entry = book.lookup(x, o)
+    if entry is None:
+        entry = bitboard.best_move(x, o)
+    value, cell = entry
+    if cell is None:
+        return None
+    return divmod(cell, 3)
@@ -0,0 +1,169 @@
+"""
+Generates knights and knaves puzzles and benchmarks the logic engine.
+
+    python bench.py generate N [--seed 0]
+    python bench.py run [--inhabitants 2 4 8 16 32 64] [--seed 0]
+
+generate prints the knowledge of a random N-inhabitant puzzle, one
+conjunct per line in formula() syntax, which logic.parse reads back. run
+generates a puzzle for each N and prints one JSON object per puzzle with
+parse throughput, the time to find every entailed literal by truth table
+(for puzzles small enough to enumerate) and by SAT, and how many
+inhabitants the puzzle determines.
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+
+from logic import (And, Biconditional, Implication, Not, Or, Symbol,
+                   entailed_symbols, entails, parse)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark knights logic.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser(
+        "generate", help="print a random puzzle"
+    )
+    generate_parser.add_argument("inhabitants", type=int)
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="benchmark growing puzzles")
+    run_parser.add_argument("--inhabitants", type=int, nargs="+",
+                            default=[2, 4, 8, 10, 16, 32, 64])
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=20,
+                            help="times to parse each puzzle's text")
+    run_parser.add_argument("--max-symbols", type=int, default=20,
+                            help="most symbols to check by truth table")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        knowledge, _, _ = puzzle(args.inhabitants, random.Random(args.seed))
+        for conjunct in knowledge.conjuncts:
+            print(conjunct.formula())
+    else:
+        for inhabitants in args.inhabitants:
+            result = run(inhabitants, args.seed, args.repeat,
+                         args.max_symbols)
+            print(json.dumps(result))
+            sys.stdout.flush()
+
+
+def name(i):
+    """
+    Returns the name of the i-th inhabitant: A to Z, then AA, AB, ...
+    """
+    letters = string.ascii_uppercase
+    result = ""
+    i += 1
+    while i:
+        i, remainder = divmod(i - 1, len(letters))
+        result = letters[remainder] + result
+    return result
+
+
+def puzzle(inhabitants, rng, depth=2):
+    """
+    Returns (knowledge, knights, knaves) for a puzzle where every
+    inhabitant makes one random statement about the kinds of inhabitants,
+    with knights[i] and knaves[i] the symbols of inhabitant i being a
+    knight or a knave. As in puzzle.py, each inhabitant is exactly one of
+    the two, knights' statements are true and knaves' are false.
+
+    Each inhabitant's kind is drawn first and statements are drawn until
+    one is true for knights and false for knaves, so every puzzle has at
+    least that solution, though it may have others.
+    """
+    knights = [Symbol(f"{name(i)} is a Knight") for i in range(inhabitants)]
+    knaves = [Symbol(f"{name(i)} is a Knave") for i in range(inhabitants)]
+
+    def statement(depth):
+        if depth == 0 or rng.random() < 0.4:
+            return rng.choice(rng.choice((knights, knaves)))
+        kind = rng.randrange(5)
+        if kind == 0:
+            return Not(statement(depth - 1))
+        if kind == 1:
+            return And(*[statement(depth - 1)
+                         for _ in range(rng.randint(2, 3))])
+        if kind == 2:
+            return Or(*[statement(depth - 1)
+                        for _ in range(rng.randint(2, 3))])
+        if kind == 3:
+            return Implication(statement(depth - 1), statement(depth - 1))
+        return Biconditional(statement(depth - 1), statement(depth - 1))
+
+    kinds = [rng.random() < 0.5 for _ in range(inhabitants)]
+    solution = {}
+    for knight, knave, kind in zip(knights, knaves, kinds):
+        solution[knight.name] = kind
+        solution[knave.name] = not kind
+
+    knowledge = And()
+    for i in range(inhabitants):
+        said = statement(depth)
+        while said.evaluate(solution) != kinds[i]:
+            said = statement(depth)
+        knowledge.add(Biconditional(knights[i], Not(knaves[i])))
+        knowledge.add(Implication(knights[i], said))
+        knowledge.add(Implication(knaves[i], Not(said)))
+    return knowledge, knights, knaves
+
+
+def run(inhabitants, seed, repeat, max_symbols):
+    """
+    Generates one puzzle and returns its benchmark result.
+    """
+    knowledge, knights, knaves = puzzle(inhabitants, random.Random(seed))
+    symbols = knights + knaves
+    lines = [conjunct.formula() for conjunct in knowledge.conjuncts]
+    characters = sum(len(line) for line in lines)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parsed = [parse(line) for line in lines]
+    parse_seconds = (time.perf_counter() - start) / repeat
+    if parsed != knowledge.conjuncts:
+        raise Exception("parsed formulas differ from the puzzle")
+
+    start = time.perf_counter()
+    by_sat = {
+        literal
+        for symbol in symbols
+        for literal in (symbol, Not(symbol))
+        if entails(knowledge, literal)
+    }
+    sat_seconds = time.perf_counter() - start
+
+    if len(symbols) <= max_symbols:
+        start = time.perf_counter()
+        by_truth_table = entailed_symbols(knowledge, symbols)
+        truth_table_seconds = time.perf_counter() - start
+        if by_truth_table != by_sat:
+            raise Exception("truth table and SAT disagree")
+    else:
+        truth_table_seconds = None
+
+    return {
+        "inhabitants": inhabitants,
+        "symbols": len(symbols),
+        "formulas": len(lines),
+        "characters": characters,
+        "formulas_per_second": len(lines) / parse_seconds,
+        "characters_per_second": characters / parse_seconds,
+        "truth_table_seconds": truth_table_seconds,
+        "sat_seconds": sat_seconds,
+        "determined": sum(
+            knight in by_sat or Not(knight) in by_sat for knight in knights
+        )
+    }
+
+
+if __name__ == "__main__":
+    main()
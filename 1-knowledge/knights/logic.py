@@ -1,8 +1,28 @@
 import itertools
+import re
+import weakref
+
+import sat
 
 
 class Sentence():
 
+    # Every node caches its hash and its set of symbols, so neither walks
+    # the tree. A node is frozen if no And below it can be added to; other
+    # nodes only trust their caches until the next And.add anywhere, when
+    # changes goes up. Interned nodes are shared and must not change
+    __slots__ = ("_hash", "_symbols", "_interned", "_frozen", "_checked",
+                 "__weakref__")
+    changes = 0
+
+    def __hash__(self):
+        if self.stale():
+            refresh(self)
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), self.arguments())
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +33,39 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        if self.stale():
+            refresh(self)
+        return self._symbols
+
+    def arguments(self):
+        """Returns the arguments the sentence was constructed from."""
+        return ()
+
+    def stale(self):
+        """Checks if the cached hash and symbols may be out of date."""
+        return not self._frozen and self._checked != Sentence.changes
+
+    def cache(self):
+        """
+        Computes the cached hash and symbols from the operands', which must
+        be up to date.
+        """
+        raise Exception("nothing to cache")
+
+    def compile(self, index, operands):
+        """
+        Returns Python expression source that evaluates the sentence over
+        an integer model m, where symbol name is true if bit index[name]
+        of m is set, given the source of each of its operands.
+        """
+        raise Exception("nothing to compile")
+
+    def encode(self, cnf):
+        """
+        Adds clauses to cnf defining a literal equal to the sentence, and
+        returns that literal.
+        """
+        raise Exception("nothing to encode")
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +95,22 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
         self.name = name
+        self._interned = False
+        self._frozen = True
+        self.cache()
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+    # Defining __eq__ drops the inherited __hash__, so every class puts it
+    # back
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return self.name
@@ -65,20 +124,38 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def arguments(self):
+        return (self.name,)
+
+    def cache(self):
+        self._hash = hash(("symbol", self.name))
+        self._symbols = frozenset((self.name,))
+        self._checked = Sentence.changes
+
+    def compile(self, index, operands):
+        return f"(m >> {index[self.name]} & 1)"
+
+    def encode(self, cnf):
+        return cnf.variable()
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
+        self._interned = False
+        self._frozen = operand._frozen
+        refresh(self)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and hash(self) == hash(other)
+            and self.operand == other.operand
+        )
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,24 +166,42 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def arguments(self):
+        return (self.operand,)
+
+    def cache(self):
+        self._hash = hash(("not", hash(self.operand)))
+        self._symbols = self.operand.symbols()
+        self._checked = Sentence.changes
+
+    def compile(self, index, operands):
+        return f"(not {operands[0]})"
+
+    def encode(self, cnf):
+        return -cnf.literal(self.operand)
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        # Conjuncts may still be added, so only interned Ands are frozen
+        self._interned = False
+        self._frozen = False
+        refresh(self)
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+    def __eq__(self, other):
+        return self is other or (
+            isinstance(other, And) and hash(self) == hash(other)
+            and self.conjuncts == other.conjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -114,8 +209,11 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        if self._interned:
+            raise Exception("cannot add to an interned sentence")
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        Sentence.changes += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,24 +224,51 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def arguments(self):
+        return tuple(self.conjuncts)
+
+    def cache(self):
+        self._hash = hash(
+            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        )
+        self._symbols = frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
+        self._checked = Sentence.changes
+
+    def compile(self, index, operands):
+        if not operands:
+            return "True"
+        return "(" + " and ".join(operands) + ")"
+
+    def encode(self, cnf):
+        literals = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        x = cnf.variable()
+        for literal in literals:
+            cnf.clauses.append([-x, literal])
+        cnf.clauses.append([x] + [-literal for literal in literals])
+        return x
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
+        self._interned = False
+        self._frozen = all(disjunct._frozen for disjunct in disjuncts)
+        refresh(self)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        return self is other or (
+            isinstance(other, Or) and hash(self) == hash(other)
+            and self.disjuncts == other.disjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -157,24 +282,52 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def arguments(self):
+        return tuple(self.disjuncts)
+
+    def cache(self):
+        self._hash = hash(
+            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        )
+        self._symbols = frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
+        self._checked = Sentence.changes
+
+    def compile(self, index, operands):
+        if not operands:
+            return "False"
+        return "(" + " or ".join(operands) + ")"
+
+    def encode(self, cnf):
+        literals = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        x = cnf.variable()
+        for literal in literals:
+            cnf.clauses.append([x, -literal])
+        cnf.clauses.append([-x] + literals)
+        return x
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self._interned = False
+        self._frozen = antecedent._frozen and consequent._frozen
+        refresh(self)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication) and hash(self) == hash(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +341,49 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def arguments(self):
+        return (self.antecedent, self.consequent)
+
+    def cache(self):
+        self._hash = hash(("implies", hash(self.antecedent),
+                           hash(self.consequent)))
+        self._symbols = self.antecedent.symbols() | self.consequent.symbols()
+        self._checked = Sentence.changes
+
+    def compile(self, index, operands):
+        antecedent, consequent = operands
+        return f"(not {antecedent} or {consequent})"
+
+    def encode(self, cnf):
+        antecedent = cnf.literal(self.antecedent)
+        consequent = cnf.literal(self.consequent)
+        x = cnf.variable()
+        cnf.clauses.append([-x, -antecedent, consequent])
+        cnf.clauses.append([x, antecedent])
+        cnf.clauses.append([x, -consequent])
+        return x
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
+        self._interned = False
+        self._frozen = left._frozen and right._frozen
+        refresh(self)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional) and hash(self) == hash(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -217,16 +395,458 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def arguments(self):
+        return (self.left, self.right)
+
+    def cache(self):
+        self._hash = hash(("biconditional", hash(self.left),
+                           hash(self.right)))
+        self._symbols = self.left.symbols() | self.right.symbols()
+        self._checked = Sentence.changes
+
+    def compile(self, index, operands):
+        left, right = operands
+        return f"((not {left}) == (not {right}))"
+
+    def encode(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        x = cnf.variable()
+        cnf.clauses.append([-x, -left, right])
+        cnf.clauses.append([-x, left, -right])
+        cnf.clauses.append([x, left, right])
+        cnf.clauses.append([x, -left, -right])
+        return x
+
+
+def refresh(sentence):
+    """
+    Recomputes the cached hash and symbols of sentence, and first those of
+    any stale sentences below it, deepest first, so deep sentences don't
+    recurse.
+    """
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        pending = [argument for argument in node.arguments()
+                   if isinstance(argument, Sentence) and argument.stale()]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        node.cache()
+
+
+# Interned sentences, keyed by their class and interned arguments, and
+# dropped once nothing else refers to them
+interned = weakref.WeakValueDictionary()
+
+
+def intern(sentence):
+    """
+    Returns the shared node structurally equal to sentence, interning it
+    and its subformulas if needed. Identical subformulas of interned
+    sentences are then one object, so they take memory once and compare
+    equal by identity. Interned Ands cannot be added to.
+    """
+    if sentence._interned:
+        return sentence
+    arguments = tuple(
+        intern(argument) if isinstance(argument, Sentence) else argument
+        for argument in sentence.arguments()
+    )
+    key = (type(sentence), arguments)
+    node = interned.get(key)
+    if node is None:
+        node = type(sentence)(*arguments)
+        node._interned = True
+        node._frozen = True
+        interned[key] = node
+    return node
+
+
+# Operators and parentheses of formula() text, or a symbol name: anything
+# up to the next operator or parenthesis
+TOKEN = re.compile(r"\s*(<=>|=>|[()¬∧∨]|(?:(?!<=>|=>)[^()¬∧∨])+)")
+
+
+def parse(text):
+    """
+    Parses a sentence written as formula() writes it, such as
+    "(A is a Knight) => (¬(B is a Knave))". Symbol names run up to the
+    next operator or parenthesis, without surrounding spaces. From
+    tightest to loosest, the operators are ¬, ∧, ∨, => (grouping to the
+    right) and <=>.
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"unexpected end of formula: {text!r}")
+        tokens.append(match.group(1).rstrip())
+        position = match.end()
+
+    # Tokens are never empty, so an empty one marks the end
+    tokens.append("")
+    position = 0
+
+    def peek():
+        return tokens[position]
+
+    def describe(token):
+        return repr(token) if token else "end"
+
+    def take(expected=None):
+        nonlocal position
+        token = tokens[position]
+        if expected is not None and token != expected:
+            raise ValueError(f"expected {describe(expected)} but found "
+                             f"{describe(token)} in formula: {text!r}")
+        position += 1
+        return token
+
+    def biconditional():
+        sentence = implication()
+        while peek() == "<=>":
+            take()
+            sentence = Biconditional(sentence, implication())
+        return sentence
+
+    def implication():
+        sentence = disjunction()
+        if peek() == "=>":
+            take()
+            return Implication(sentence, implication())
+        return sentence
+
+    def disjunction():
+        disjuncts = [conjunction()]
+        while peek() == "∨":
+            take()
+            disjuncts.append(conjunction())
+        return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+    def conjunction():
+        conjuncts = [unary()]
+        while peek() == "∧":
+            take()
+            conjuncts.append(unary())
+        return conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+
+    def unary():
+        token = take()
+        if token == "¬":
+            return Not(unary())
+        if token == "(":
+            sentence = biconditional()
+            take(")")
+            return sentence
+        if token in ("", ")", "∧", "∨", "=>", "<=>"):
+            raise ValueError(f"expected a sentence but found "
+                             f"{describe(token)} in formula: {text!r}")
+        return Symbol(token)
+
+    sentence = biconditional()
+    take("")
+    return sentence
+
+
+class CNF():
+    """
+    Tseitin encoding of sentences into clauses. Every subformula gets a
+    variable constrained to equal it, so the clauses grow linearly with
+    the sentences rather than exponentially. Literals are nonzero integers
+    with -v the negation of variable v, as in sat.Solver.
+    """
+
+    def __init__(self):
+        self.num_variables = 0
+        self.clauses = []
+
+        # Literal of each sentence encoded so far, so shared subformulas
+        # and repeated symbols are only encoded once
+        self.literals = {}
+
+    def variable(self):
+        self.num_variables += 1
+        return self.num_variables
+
+    def literal(self, sentence):
+        """
+        Returns the literal equal to sentence, encoding it if needed.
+        """
+        literal = self.literals.get(sentence)
+        if literal is None:
+            # Encode subformulas before the sentences containing them, so
+            # each encode finds its operands' literals here and deep
+            # sentences don't recurse
+            stack = [sentence]
+            while stack:
+                node = stack[-1]
+                if node in self.literals:
+                    stack.pop()
+                    continue
+                pending = [argument for argument in node.arguments()
+                           if isinstance(argument, Sentence)
+                           and argument not in self.literals]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                self.literals[node] = node.encode(self)
+            literal = self.literals[sentence]
+        return literal
+
+
+# Deepest nesting of subformulas compiled into one expression. Python's
+# parser rejects expressions nested a couple of hundred parentheses deep,
+# so deeper subformulas are assigned to local variables first
+MAX_NESTING = 20
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Compiles a sentence into a function of an integer model m, where the
+    i-th symbol in symbols is true if bit i of m is set.
+
+    The sentence is walked with an explicit stack, so however deeply it
+    nests, neither the walk nor the generated source goes deeper than
+    MAX_NESTING.
+    """
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    # Source and nesting depth of each subformula compiled so far, keyed
+    # by identity so shared subformulas are compiled once without
+    # comparing deep trees
+    sources = {}
+    depths = {}
+    assignments = []
+    stack = [sentence]
+    while stack:
+        node = stack[-1]
+        if id(node) in sources:
+            stack.pop()
+            continue
+        children = [argument for argument in node.arguments()
+                    if isinstance(argument, Sentence)]
+        pending = [child for child in children if id(child) not in sources]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        source = node.compile(index, [sources[id(child)]
+                                      for child in children])
+        depth = 1 + max((depths[id(child)] for child in children),
+                        default=0)
+        if depth > MAX_NESTING:
+            name = f"v{len(assignments)}"
+            assignments.append(f"    {name} = {source}\n")
+            source = name
+            depth = 0
+        sources[id(node)] = source
+        depths[id(node)] = depth
+
+    namespace = {}
+    exec("def check(m):\n" + "".join(assignments)
+         + f"    return {sources[id(sentence)]}\n", namespace)
+    return namespace["check"]
+
+
+class KnowledgeBase():
+    """
+    A knowledge base that is prepared once and then asked many queries.
+
+    While it has at most MAX_ENUMERATED symbols, its satisfying models are
+    kept as integers (bit i for the i-th symbol), and a query is entailed
+    if it holds in all of them. The sentences are also kept encoded in a
+    SAT solver, which answers queries once there are too many symbols, or
+    when a query mentions symbols the knowledge base does not.
+
+    Conjuncts appended to the underlying And, through And.add or
+    KnowledgeBase.add, are picked up on the next query: the models are
+    filtered by the new conjuncts and their clauses are added to the
+    solver, so nothing already done is repeated.
+    """
+
+    # Most symbols for which satisfying models are enumerated and kept
+    MAX_ENUMERATED = 20
+
+    def __init__(self, knowledge=None):
+        if knowledge is None:
+            knowledge = And()
+        elif not isinstance(knowledge, And):
+            knowledge = And(knowledge)
+        self.knowledge = knowledge
+
+        # Symbol names in bit order, and the bit of each
+        self.symbols = []
+        self.index = {}
+
+        # Satisfying models so far, or None once there are too many symbols
+        self.models = [0]
+
+        self.cnf = CNF()
+        self.solver = sat.Solver()
+
+        # Conjuncts and clauses already added
+        self.conjuncts = 0
+        self.clauses = 0
+
+        self.update()
+
+    def add(self, sentence):
+        """
+        Adds sentence to the knowledge base.
+        """
+        self.knowledge.add(sentence)
+        self.update()
+
+    def ask(self, query):
+        """
+        Checks if the knowledge base entails query.
+        """
+        self.update()
+        if (self.models is not None
+                and query.symbols().issubset(self.index)):
+            check = compile_sentence(query, self.symbols)
+            return all(map(check, self.models))
+
+        literal = self.cnf.literal(query)
+        self.flush()
+        return not self.solver.solve([-literal])
+
+    def update(self):
+        """
+        Adds conjuncts appended to the knowledge since the last update.
+        """
+        conjuncts = self.knowledge.conjuncts
+        while self.conjuncts < len(conjuncts):
+            conjunct = conjuncts[self.conjuncts]
+            self.conjuncts += 1
+
+            # Conjuncts always hold, so their literals are unit clauses
+            self.cnf.clauses.append([self.cnf.literal(conjunct)])
+
+            new = sorted(conjunct.symbols().difference(self.index))
+            start = len(self.symbols)
+            for symbol in new:
+                self.index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            if self.models is None:
+                continue
+            if len(self.symbols) > self.MAX_ENUMERATED:
+                self.models = None
+                continue
+
+            # Extend every model with each assignment of the new symbols,
+            # keeping those where the conjunct holds
+            check = compile_sentence(conjunct, self.symbols)
+            models = []
+            for model in self.models:
+                for assignment in range(1 << len(new)):
+                    extended = model | assignment << start
+                    if check(extended):
+                        models.append(extended)
+            self.models = models
+        self.flush()
+
+    def flush(self):
+        """
+        Adds clauses encoded since the last flush to the solver.
+        """
+        clauses = self.cnf.clauses
+        while self.clauses < len(clauses):
+            self.solver.add_clause(clauses[self.clauses])
+            self.clauses += 1
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking with a SAT solver
+    that knowledge and not query cannot both be true. Gives the same
+    results as model_check, without enumerating every model.
+    """
+    cnf = CNF()
+    knowledge_literal = cnf.literal(knowledge)
+    query_literal = cnf.literal(query)
+    solver = sat.Solver()
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+    return not solver.solve([knowledge_literal, -query_literal])
 
 
 def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    """
+    Checks if knowledge base entails query.
+
+    Compiles both sentences into one Python function of a bit-packed
+    model and runs it over every integer 0 .. 2^n - 1, so each model is
+    checked without copying dictionaries or walking the sentence trees.
+    """
+
+    # Get all symbols in both knowledge and query
+    symbols = sorted(knowledge.symbols() | query.symbols())
+
+    # Entailment fails on any model where knowledge holds but query doesn't
+    check = compile_sentence(Implication(knowledge, query), symbols)
+    return all(map(check, range(1 << len(symbols))))
+
+
+def entailed_symbols(knowledge, symbols):
+    """
+    Returns the set of literals, each a symbol in symbols or its negation,
+    that knowledge base entails, enumerating its models once however many
+    symbols are asked about.
+
+    A symbol is entailed if it is true in every model of the knowledge,
+    and its negation if it is true in none, so it is enough to keep the
+    AND and the OR of the models where the knowledge holds.
+    """
+    names = sorted(knowledge.symbols())
+    check = compile_sentence(knowledge, names)
+    everywhere = full = (1 << len(names)) - 1
+    somewhere = 0
+    satisfiable = False
+    for model in filter(check, range(1 << len(names))):
+        satisfiable = True
+        everywhere &= model
+        somewhere |= model
+        if not everywhere and somewhere == full:
+            # Nothing about the knowledge's own symbols is entailed
+            break
+
+    # Without models, everything is entailed
+    if not satisfiable:
+        return {literal for symbol in symbols
+                for literal in (symbol, Not(symbol))}
+
+    index = {name: i for i, name in enumerate(names)}
+    entailed = set()
+    for symbol in symbols:
+        # Symbols the knowledge doesn't mention can be either
+        bit = index.get(symbol.name)
+        if bit is None:
+            continue
+        if everywhere >> bit & 1:
+            entailed.add(symbol)
+        if not somewhere >> bit & 1:
+            entailed.add(Not(symbol))
+    return entailed
+
+
+def model_check_recursive(knowledge, query):
+    """
+    Checks if knowledge base entails query, by recursively enumerating
+    models as dictionaries. Slower than model_check but gives the same
+    results.
+    """
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -257,7 +877,7 @@ def model_check(knowledge, query):
                     check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = set(knowledge.symbols() | query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
@@ -0,0 +1,179 @@
+"""
+Parallel truth-table model checking.
+
+The 2^n models are split into shards by fixing the values of the top few
+symbols in bit order, and each shard is enumerated by a worker process
+with its own compiled evaluator. Workers share a stop flag: as soon as
+one finds a model where the knowledge holds but the query does not, the
+others stop at their next chunk, and unstarted shards are cancelled.
+
+Usage:
+    python parallel.py [--inhabitants 11] [--workers 1 2 4]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import logic
+
+# Models checked between looks at the stop flag
+CHUNK = 1 << 14
+
+# Fewest symbols worth spreading across processes; smaller checks run in
+# the calling process
+MIN_SYMBOLS = 16
+
+# Shards per worker, so workers that finish early can take another
+SHARDS_PER_WORKER = 4
+
+# Shared between the driver and the worker processes: set once any shard
+# finds a counter-model
+shared = {}
+
+
+def init_worker(stop):
+    shared["stop"] = stop
+
+
+def check_shard(knowledge, query, symbols, start, stop):
+    """
+    Checks the models numbered start up to stop. Returns False if one is
+    a counter-model, True if none is, and None if another shard found one
+    first.
+    """
+    check = logic.compile_sentence(logic.Implication(knowledge, query),
+                                   symbols)
+    flag = shared["stop"]
+    for chunk in range(start, stop, CHUNK):
+        if flag.is_set():
+            return None
+        if not all(map(check, range(chunk, min(chunk + CHUNK, stop)))):
+            flag.set()
+            return False
+    return True
+
+
+class ParallelChecker():
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        context = multiprocessing.get_context()
+        self.stop = context.Event()
+        self.pool = ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=init_worker,
+            initargs=(self.stop,)
+        )
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def model_check(self, knowledge, query):
+        """
+        Checks if knowledge base entails query, like logic.model_check,
+        with the models shared out across the pool.
+        """
+        symbols = sorted(knowledge.symbols() | query.symbols())
+        if len(symbols) < MIN_SYMBOLS:
+            return logic.model_check(knowledge, query)
+
+        # Fix the top bits of the model number: each shard is then one
+        # contiguous range of models
+        bits = min(len(symbols),
+                   math.ceil(math.log2(self.workers * SHARDS_PER_WORKER)))
+        size = 1 << (len(symbols) - bits)
+        self.stop.clear()
+        pending = {
+            self.pool.submit(check_shard, knowledge, query, symbols,
+                             shard * size, (shard + 1) * size)
+            for shard in range(1 << bits)
+        }
+
+        entailed = True
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any(future.result() is False for future in done):
+                entailed = False
+                for future in pending:
+                    future.cancel()
+                wait(pending)
+                break
+        self.stop.clear()
+        return entailed
+
+
+def model_check(knowledge, query, workers=None):
+    """
+    Checks if knowledge base entails query across workers processes.
+    """
+    with ParallelChecker(workers) as checker:
+        return checker.model_check(knowledge, query)
+
+
+def scaled_puzzle(inhabitants):
+    """
+    Returns (knowledge, knights): puzzle 1 scaled up, where the first
+    inhabitant says "We are all knaves." and every other inhabitant says
+    the one before is a knave, and the symbols of each inhabitant being a
+    knight. The only solution alternates knave, knight, knave, ...
+    """
+    knights = [logic.Symbol(f"{i} is a Knight") for i in range(inhabitants)]
+    knaves = [logic.Symbol(f"{i} is a Knave") for i in range(inhabitants)]
+    knowledge = logic.And()
+    for i in range(inhabitants):
+        knowledge.add(logic.Biconditional(knights[i], logic.Not(knaves[i])))
+        if i == 0:
+            statement = logic.And(*knaves)
+        else:
+            statement = knaves[i - 1]
+        knowledge.add(logic.Implication(knights[i], statement))
+        knowledge.add(logic.Implication(knaves[i], logic.Not(statement)))
+    return knowledge, knights
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure parallel model checking speedup."
+    )
+    parser.add_argument("--inhabitants", type=int, default=11,
+                        help="inhabitants of the scaled puzzle")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    knowledge, knights = scaled_puzzle(args.inhabitants)
+    symbols = len(knowledge.symbols())
+
+    # The second inhabitant is a knight, so every model is checked; the
+    # first is not, so the check stops at the first counter-model
+    queries = [
+        ("entailed", knights[1]),
+        ("not entailed", knights[0])
+    ]
+    for name, query in queries:
+        start = time.perf_counter()
+        expected = logic.model_check(knowledge, query)
+        sequential = time.perf_counter() - start
+        print(f"{name}, {symbols} symbols: sequential {sequential:.2f}s")
+        for workers in sorted(set(args.workers)):
+            with ParallelChecker(workers) as checker:
+                start = time.perf_counter()
+                result = checker.model_check(knowledge, query)
+                elapsed = time.perf_counter() - start
+            status = "same" if result == expected else "DIFFERENT"
+            speedup = sequential / elapsed
+            print(f"    {workers} workers: {elapsed:.2f}s, speedup "
+                  f"{speedup:.2f}x, {speedup / workers:.2f}x per core, "
+                  f"{status}")
+
+
+if __name__ == "__main__":
+    main()
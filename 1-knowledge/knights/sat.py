@@ -0,0 +1,325 @@
+"""
+Conflict-driven clause learning (CDCL) SAT solver.
+
+Variables are positive integers and literals are nonzero integers, with -v
+the negation of v, as in the DIMACS format. Each clause watches two of its
+literals and is only looked at when one of them becomes false. Conflicts
+are analysed back to their first unique implication point, the learned
+clause is kept and the search jumps back to the level where it asserts a
+literal. Branching follows variable activity (VSIDS) with saved phases and
+geometric restarts.
+"""
+
+import heapq
+
+# Activity is multiplied by 1 / DECAY after each conflict, so variables in
+# recent conflicts are preferred
+DECAY = 0.95
+
+# Conflicts before the first restart, and the growth of the limit after it
+RESTART = 100
+RESTART_GROWTH = 1.5
+
+
+class Solver():
+    def __init__(self):
+        self.num_variables = 0
+        self.clauses = []
+        self.learnts = []
+        self.ok = True
+        self.model = None
+
+        # Clauses watching each literal, checked when it becomes false
+        self.watches = {}
+
+        # Per variable, indexed from 1: 1 for true, -1 for false and 0 for
+        # unassigned; the decision level of the assignment; the clause that
+        # implied it; its activity and the last value it had
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+
+        # Assigned literals in order, where each decision level starts, and
+        # how many of them have been propagated
+        self.trail = []
+        self.trail_lim = []
+        self.head = 0
+
+        # Unassigned variables by activity, with stale entries skipped
+        self.heap = []
+        self.increment = 1.0
+
+        self.conflicts = 0
+        self.decisions = 0
+
+    def new_variable(self):
+        """
+        Returns a fresh variable.
+        """
+        self.num_variables += 1
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        heapq.heappush(self.heap, (-0.0, self.num_variables))
+        return self.num_variables
+
+    def value(self, literal):
+        """
+        Returns 1 if literal is true, -1 if false and 0 if unassigned.
+        """
+        if literal > 0:
+            return self.values[literal]
+        return -self.values[-literal]
+
+    def add_clause(self, literals):
+        """
+        Adds the disjunction of literals. Returns False if the clauses are
+        now known to be unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in literals:
+            while abs(literal) > self.num_variables:
+                self.new_variable()
+
+        # Drop duplicate literals and ones already false, and skip clauses
+        # that are tautologies or already true
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                return True
+            value = self.value(literal)
+            if value == 1:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every literal in
+        assumptions true, and sets model to a dictionary mapping variables
+        to booleans; otherwise returns False. Learned clauses are kept for
+        later calls.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            while abs(literal) > self.num_variables:
+                self.new_variable()
+        self.backtrack(0)
+
+        restart_limit = RESTART
+        restart_conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                restart_conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self.watch(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment /= DECAY
+                continue
+
+            if restart_conflicts >= restart_limit:
+                restart_conflicts = 0
+                restart_limit = int(restart_limit * RESTART_GROWTH)
+                self.backtrack(0)
+                continue
+
+            # Assumptions take the first decision levels, one each
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == 1:
+                    self.trail_lim.append(len(self.trail))
+                    continue
+                if value == -1:
+                    self.backtrack(0)
+                    return False
+            else:
+                literal = self.decide()
+                if literal is None:
+                    self.model = {
+                        variable: self.values[variable] == 1
+                        for variable in range(1, self.num_variables + 1)
+                    }
+                    self.backtrack(0)
+                    return True
+
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(literal, None)
+
+    def watch(self, clause):
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_lim)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by a clause with all its other
+        literals false. Returns a clause with all its literals false, or
+        None if there is no conflict.
+        """
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+        while self.head < len(trail):
+            false = -trail[self.head]
+            self.head += 1
+            watchers = watches.get(false)
+            if not watchers:
+                continue
+
+            kept = []
+            for i, clause in enumerate(watchers):
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                value = values[first] if first > 0 else -values[-first]
+                if value == 1:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (values[literal] if literal > 0
+                            else -values[-literal]) != -1:
+                        clause[1], clause[k] = literal, false
+                        watches.setdefault(literal, []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value == -1:
+                        kept.extend(watchers[i + 1:])
+                        watches[false] = kept
+                        self.head = len(trail)
+                        return clause
+                    self.assign(first, clause)
+            watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learnt, level): a clause implied by the clauses that is
+        false at the current decision level except for its first literal
+        (the first unique implication point), and the level to jump back
+        to, where that literal becomes implied.
+        """
+        levels = self.levels
+        level = len(self.trail_lim)
+        seen = set()
+        learnt = [None]
+        counter = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable not in seen and levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if levels[variable] == level:
+                        counter += 1
+                    else:
+                        learnt.append(literal)
+
+            # Resolve on the latest current-level literal in the clause
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal from the highest level below the current one,
+        # which is the last to be unassigned
+        second = max(range(1, len(learnt)),
+                     key=lambda i: levels[abs(learnt[i])])
+        learnt[1], learnt[second] = learnt[second], learnt[1]
+        return learnt, levels[abs(learnt[1])]
+
+    def backtrack(self, level):
+        """
+        Unassigns every literal above decision level.
+        """
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            self.phases[variable] = literal > 0
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.head = start
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            # Rescale before activities overflow
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [
+                (-self.activity[v], v)
+                for v in range(1, self.num_variables + 1)
+                if self.values[v] == 0
+            ]
+            heapq.heapify(self.heap)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def decide(self):
+        """
+        Returns the saved phase of the most active unassigned variable, or
+        None if every variable is assigned.
+        """
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if (self.values[variable] == 0
+                    and -activity == self.activity[variable]):
+                return variable if self.phases[variable] else -variable
+        return None